@@ -0,0 +1,75 @@
+"""
+Time audit.tail() on a large synthetic audit log against the old
+read-everything approach.
+
+    python benchmarks/bench_audit_tail.py --size-gb 2
+    python benchmarks/bench_audit_tail.py --size-gb 2 --skip-legacy   # legacy path needs RAM ~ several x file size
+
+The log is written to a temp directory (or --dir) and removed afterwards.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shona_core import audit  # noqa: E402
+
+
+def _generate(path: Path, size_bytes: int) -> int:
+    line = (json.dumps({"ts": 1700000000, "kind": "owner_verify", "data": {"ok": True, "ttl": 300}}) + "\n").encode()
+    chunk = line * max(1, (4 * 1024 * 1024) // len(line))
+    written = 0
+    with path.open("wb") as f:
+        while written < size_bytes:
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _legacy_tail(path: Path, n: int) -> list[dict]:
+    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    return [json.loads(x) for x in lines[-n:]]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-gb", type=float, default=2.0)
+    ap.add_argument("--tail", type=int, default=50)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--dir", type=str, default=None)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="shona-bench-", dir=args.dir))
+    try:
+        audit.AUDIT_DIR = tmp
+        audit.AUDIT_FILE = tmp / "events.jsonl"
+        size = _generate(audit.AUDIT_FILE, int(args.size_gb * 1024**3))
+
+        res: dict = {"file_bytes": size, "tail": args.tail}
+        samples = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            items = audit.tail(args.tail)
+            samples.append(time.perf_counter() - t0)
+        res["reverse_seek_ms"] = round(min(samples) * 1000, 3)
+        res["items"] = len(items)
+
+        if not args.skip_legacy:
+            t0 = time.perf_counter()
+            _legacy_tail(audit.AUDIT_FILE, args.tail)
+            res["legacy_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        print(json.dumps(res, indent=2))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Import-time regression check for the CLI. Exits 1 when `import shona_core.cli`
+or a representative subcommand goes over budget, or pulls in a module that
+only other subcommands need.
+
+    python benchmarks/bench_cli_import.py
+    python benchmarks/bench_cli_import.py --budget-ms 40 --command-budget-ms 90 --rounds 9
+
+Numbers come from `python -X importtime` in fresh interpreters (median). For
+subcommands, main() runs with a fake argv in a scratch directory, and the time
+is everything imported after interpreter start-up (site, encodings, ... are
+subtracted).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# must stay out of the CLI's import path; each belongs to specific subcommands
+FORBIDDEN = [
+    "shona_core.scan",
+    "shona_core.diff",
+    "shona_core.audit",
+    "shona_core.voice",
+    "shona_core.catalog",
+    "shona_core.owner",
+    "sqlite3",
+    "concurrent.futures",
+]
+
+# argv -> modules it legitimately needs from FORBIDDEN
+COMMANDS = {
+    "--help": [],
+    "status": [],
+    "audit show": ["shona_core.audit"],
+}
+
+_RUN_MAIN = (
+    "import sys\n"
+    "from shona_core.cli import main\n"
+    "sys.argv = ['shona', *sys.argv[1:]]\n"
+    "try:\n"
+    "    main()\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+
+
+def _importtime(code: str, argv: list[str], cwd: Path) -> list[tuple[int, str]]:
+    """
+    [(cumulative_us, name)] for top-level imports, in order.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT), os.environ.get("PYTHONPATH", "")])}
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *argv],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out = []
+    for line in r.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not line.startswith("import time:"):
+            continue
+        raw_name = parts[2]
+        if raw_name.startswith("  "):
+            continue  # nested: already counted in its parent's cumulative time
+        try:
+            out.append((int(parts[1]), raw_name.strip()))
+        except ValueError:
+            continue  # header line
+    return out
+
+
+def _import_us(module: str) -> int:
+    for us, name in reversed(_importtime(f"import {module}", [], ROOT)):
+        if name == module:
+            return us
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def _command_us(argv: list[str], startup: set[str], cwd: Path) -> int:
+    return sum(us for us, name in _importtime(_RUN_MAIN, argv, cwd) if name not in startup)
+
+
+def _loaded(code: str, argv: list[str], cwd: Path) -> set[str]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT), os.environ.get("PYTHONPATH", "")])}
+    r = subprocess.run(
+        [sys.executable, "-c", code + "import sys\nprint('\\n'.join(sys.modules), file=sys.stderr)\n", *argv],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(r.stderr.split())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=7)
+    ap.add_argument("--budget-ms", type=float, default=60.0)
+    ap.add_argument("--command-budget-ms", type=float, default=120.0)
+    args = ap.parse_args()
+
+    _import_us("shona_core.cli")  # warm the bytecode cache
+    samples = [_import_us("shona_core.cli") for _ in range(args.rounds)]
+    median_ms = round(statistics.median(samples) / 1000, 2)
+    leaked = sorted(m for m in FORBIDDEN if m in _loaded("import shona_core.cli\n", [], ROOT))
+
+    res: dict = {
+        "import_median_ms": median_ms,
+        "import_min_ms": round(min(samples) / 1000, 2),
+        "budget_ms": args.budget_ms,
+        "forbidden_loaded": leaked,
+        "ok": median_ms <= args.budget_ms and not leaked,
+        "commands": {},
+    }
+
+    scratch = Path(tempfile.mkdtemp(prefix="shona-import-"))
+    try:
+        startup = {name for _, name in _importtime("pass", [], scratch)}
+        for cmd, allowed in COMMANDS.items():
+            argv = cmd.split()
+            _command_us(argv, startup, scratch)  # warm: first run may create .shona/
+            cmd_samples = [_command_us(argv, startup, scratch) for _ in range(args.rounds)]
+            cmd_median = round(statistics.median(cmd_samples) / 1000, 2)
+            cmd_leaked = sorted(m for m in FORBIDDEN if m not in allowed and m in _loaded(_RUN_MAIN, argv, scratch))
+            ok = cmd_median <= args.command_budget_ms and not cmd_leaked
+            res["commands"][cmd] = {
+                "median_ms": cmd_median,
+                "min_ms": round(min(cmd_samples) / 1000, 2),
+                "budget_ms": args.command_budget_ms,
+                "forbidden_loaded": cmd_leaked,
+                "ok": ok,
+            }
+            res["ok"] = res["ok"] and ok
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(json.dumps(res, indent=2))
+    raise SystemExit(0 if res["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the parallel pruned walker (shona_core.find) against the old
+rglob + is_file() search, on a directory you point it at.
+
+    python benchmarks/bench_find.py --root ~ --query report
+    python benchmarks/bench_find.py --root /tmp/tree --query zzzz --rounds 3
+
+A query that matches nothing forces both to walk the whole tree.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shona_core.find import find_files  # noqa: E402
+
+
+def _rglob(query: str, root: Path) -> list[str]:
+    q = query.lower()
+    return [str(p) for p in root.rglob("*") if p.is_file() and q in p.name.lower()]
+
+
+def _walk(query: str, root: Path) -> list[str]:
+    return list(find_files(query, [root], limit=10**9, budget_s=3600))
+
+
+def _first_hit(query: str, root: Path) -> float | None:
+    t0 = time.perf_counter()
+    for _ in find_files(query, [root], limit=1, budget_s=3600):
+        return round((time.perf_counter() - t0) * 1000, 2)
+    return None
+
+
+def _time(fn, query: str, root: Path, rounds: int) -> dict:
+    samples = []
+    n = 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        n = len(fn(query, root))
+        samples.append(time.perf_counter() - t0)
+    return {
+        "hits": n,
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default=str(Path.home()))
+    ap.add_argument("--query", default="zzzzqqqq")
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+    root = Path(args.root).expanduser()
+
+    res = {
+        "walk": _time(_walk, args.query, root, args.rounds),
+        "rglob": _time(_rglob, args.query, root, args.rounds),
+        "walk_first_hit_ms": _first_hit(args.query, root),
+    }
+    res["speedup"] = round(res["rglob"]["median_ms"] / max(res["walk"]["median_ms"], 0.001), 2)
+    print(json.dumps(res, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare the native listening-socket readers (sock_diag, /proc/net fallback)
+against the legacy `ss` path.
+
+    python benchmarks/bench_ports.py --rounds 20
+    python benchmarks/bench_ports.py --listen 20000   # open N extra listening sockets first
+
+Linux only. --listen may need a raised `ulimit -n`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shona_core.modules.ports import _list_listening_ports_procfs, _list_listening_ports_ss  # noqa: E402
+
+
+def _time(fn, rounds: int) -> dict:
+    samples = []
+    n = 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        n = len(fn())
+        samples.append(time.perf_counter() - t0)
+    return {
+        "items": n,
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--listen", type=int, default=0, help="Open N extra TCP listeners on 127.0.0.1")
+    args = ap.parse_args()
+
+    socks: list[socket.socket] = []
+    try:
+        for _ in range(args.listen):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            s.listen(1)
+            socks.append(s)
+
+        res = {
+            "procfs": _time(_list_listening_ports_procfs, args.rounds),
+            "proc_net_only": _time(lambda: _list_listening_ports_procfs(use_diag=False), args.rounds),
+            "ss": _time(_list_listening_ports_ss, args.rounds),
+        }
+        res["speedup"] = round(res["ss"]["median_ms"] / max(res["procfs"]["median_ms"], 0.001), 2)
+        print(json.dumps(res, indent=2))
+    finally:
+        for s in socks:
+            s.close()
+
+
+if __name__ == "__main__":
+    main()
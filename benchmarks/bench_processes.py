@@ -0,0 +1,63 @@
+"""
+Compare the /proc process collector against the legacy `ps` path.
+
+    python benchmarks/bench_processes.py --rounds 20
+    python benchmarks/bench_processes.py --spawn 5000   # pad the host to 5k+ processes
+
+Linux only (the procfs collector needs /proc).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shona_core.modules.processes import _list_processes_procfs, _list_processes_ps  # noqa: E402
+
+
+def _time(fn, rounds: int) -> dict:
+    samples = []
+    n = 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        n = len(fn())
+        samples.append(time.perf_counter() - t0)
+    return {
+        "items": n,
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--spawn", type=int, default=0, help="Start N idle `sleep` processes first")
+    args = ap.parse_args()
+
+    kids: list[subprocess.Popen] = []
+    try:
+        for _ in range(args.spawn):
+            kids.append(subprocess.Popen(["sleep", "600"]))  # noqa: S603,S607
+
+        res = {
+            "procfs": _time(_list_processes_procfs, args.rounds),
+            "ps": _time(_list_processes_ps, args.rounds),
+        }
+        res["speedup"] = round(res["ps"]["median_ms"] / max(res["procfs"]["median_ms"], 0.001), 2)
+        print(json.dumps(res, indent=2))
+    finally:
+        for k in kids:
+            k.kill()
+        for k in kids:
+            k.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Scale benchmark suite: diff, ignore filtering, risk scoring, snapshot io and
+audit tail on synthetic snapshots (benchmarks/synth.py).
+
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --processes 2000 --sockets 10000 --rounds 3
+    python benchmarks/run_suite.py --compare benchmarks/results/<older-rev>.json
+
+Everything runs inside a temp directory (snapshots, blob store, catalog,
+audit log), so the repo's own .shona is untouched. Results are written to
+--out (default benchmarks/results/<git rev>.json); with --compare each
+benchmark's median is also shown as a ratio against an earlier results file.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import synth  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# a realistic mix: exact names, globs, regexes, networks and port ranges
+IGNORE_RULES = {
+    "processes": ["svchost.exe", "glob:update*", "glob:*helper*", "re:^(edge|cloud)[a-z]+\\d+$"],
+    "ports": ["cidr:127.0.0.0/8", "port:udp:5000-6000", "glob:TCP:[[]::1]:*", "TCP:0.0.0.0:445"],
+    "startup": ["glob:*onedrive*", "re:.*\\\\Office\\\\.*"],
+    "scheduled_tasks": ["glob:\\Search\\*", "glob:\\Defender\\*", "re:.*sync\\d+$"],
+    "services": ["glob:audio*", "re:^print.*"],
+    "paths": ["C:\\Windows\\System32", "C:\\Program Files\\Office"],
+}
+
+
+def _time(fn, rounds: int, setup=None) -> dict:
+    samples = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "rounds": rounds,
+    }
+
+
+def _git_rev() -> str:
+    try:
+        r = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True)
+        return r.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _audit_log(events: int) -> None:
+    from shona_core import audit
+
+    batch = 5000
+    ts = 1_767_225_600
+    for start in range(0, events, batch):
+        audit._commit([
+            {"ts": ts + i, "kind": "scan" if i % 3 else "diff", "data": {"n": i, "snapshot": f"synth-host_{i}.json"}}
+            for i in range(start, min(start + batch, events))
+        ])
+
+
+def run(args: argparse.Namespace) -> dict:
+    from shona_core import audit, catalog, diff, retention
+    from shona_core.risk import score_diff
+    from shona_core.utils import io, statefile
+
+    scale = {k: getattr(args, k) for k in synth.DEFAULT_SCALE}
+    t0 = time.perf_counter()
+    a = synth.generate(scale, seed=args.seed)
+    b = synth.churn(a, args.churn, seed=args.seed + 1)
+    setup_s = time.perf_counter() - t0
+
+    res: dict = {}
+    snaps = Path(".shona/snapshots")
+    paths: dict[str, tuple[Path, Path]] = {}
+    writers = {"json": io.write_json, "snapz": io.write_snapz, "snapm": io.write_snapm}
+    readers = {"json": io.read_json, "snapz": io.read_snapz, "snapm": io.read_snapm}
+    for fmt, write in writers.items():
+        pa, pb = snaps / f"synth-a.{fmt}", snaps / f"synth-b.{fmt}"
+        res[f"io.write_{fmt}"] = _time(lambda: write(pa, a), args.rounds)
+        write(pb, b)
+        res[f"io.read_{fmt}"] = _time(lambda: readers[fmt](pa), args.rounds)
+        if fmt != "json":
+            res[f"io.read_{fmt}.processes"] = _time(lambda: readers[fmt](pa, sections=["processes"]), args.rounds)
+        res[f"io.{fmt}_bytes"] = pa.stat().st_size
+        paths[fmt] = (pa, pb)
+
+    # index up front: the first lookup would otherwise rebuild inside a timed round
+    catalog.rebuild()
+    # empty ignore list for the raw numbers
+    retention.save_ignore(dict(retention.DEFAULT_IGNORE))
+
+    def cold() -> None:
+        diff._RAW_CACHE.clear()
+        diff._FILTERED_CACHE.clear()
+
+    for fmt, (pa, pb) in paths.items():
+        res[f"diff_between.cold.{fmt}"] = _time(lambda: diff.diff_between(pa, pb), args.rounds, setup=cold)
+    pa, pb = paths["json"]
+    diff.diff_between(pa, pb)
+    res["diff_between.warm"] = _time(lambda: diff.diff_between(pa, pb), args.rounds)
+
+    ka, kb = diff.key_sets(a), diff.key_sets(b)
+    ha, hb = diff.hash_maps(a), diff.hash_maps(b)
+    res["diff_key_sets"] = _time(lambda: diff.diff_key_sets(ka, kb, ha, hb), args.rounds)
+
+    raw = diff.diff_key_sets(ka, kb, ha, hb)
+    retention.save_ignore(IGNORE_RULES)
+    retention.apply_ignore_to_diff(raw)  # compile the rules once
+    res["apply_ignore_to_diff"] = _time(lambda: retention.apply_ignore_to_diff(raw), args.rounds)
+    filtered = retention.apply_ignore_to_diff(raw)
+    res["score_diff"] = _time(lambda: score_diff(raw), args.rounds)
+    counts = {
+        k: {
+            **{s: len(v.get(s) or []) for s in ("added", "removed", "modified")},
+            "ignored": sum(len(v.get(s) or []) - len(filtered[k].get(s) or []) for s in ("added", "removed", "modified")),
+        }
+        for k, v in raw.items()
+        if isinstance(v, dict)
+    }
+
+    state = Path(".shona/state/bench.json")
+    doc = {"k": list(range(200)), "nested": {str(i): {"v": i} for i in range(200)}}
+    res["statefile.write_json"] = _time(lambda: statefile.write_json(state, doc), args.rounds)
+    res["statefile.read_json.cached"] = _time(lambda: statefile.read_json(state), args.rounds)
+    res["statefile.read_json.cold"] = _time(lambda: statefile.read_json(state), args.rounds, setup=lambda: statefile.forget(state))
+
+    _audit_log(args.audit_events)
+    res["audit.tail.50"] = _time(lambda: audit.tail(50), args.rounds)
+    res["audit.tail.500"] = _time(lambda: audit.tail(500), args.rounds)
+    res["audit.file_bytes"] = audit.AUDIT_FILE.stat().st_size
+
+    return {
+        "rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "scale": {**scale, "churn": args.churn, "seed": args.seed, "audit_events": args.audit_events},
+        "setup_s": round(setup_s, 2),
+        "diff_counts": counts,
+        "results": res,
+    }
+
+
+def compare(current: dict, previous: dict) -> dict:
+    """
+    median_ms ratio current/previous per benchmark present in both (>1 is slower).
+    """
+    out = {}
+    for name, cur in current["results"].items():
+        prev = previous.get("results", {}).get(name)
+        if isinstance(cur, dict) and isinstance(prev, dict) and prev.get("median_ms"):
+            out[name] = round(cur["median_ms"] / prev["median_ms"], 3)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    for k, v in synth.DEFAULT_SCALE.items():
+        ap.add_argument(f"--{k}", type=int, default=v)
+    ap.add_argument("--churn", type=float, default=0.02)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--audit-events", type=int, default=200_000)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--out", type=str, default=None, help="Results file (default benchmarks/results/<rev>.json)")
+    ap.add_argument("--compare", type=str, default=None, help="Earlier results file to compare medians against")
+    ap.add_argument("--dir", type=str, default=None, help="Parent for the temp working directory")
+    args = ap.parse_args()
+
+    cwd = os.getcwd()
+    tmp = Path(tempfile.mkdtemp(prefix="shona-suite-", dir=args.dir))
+    try:
+        os.chdir(tmp)
+        report = run(args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        report["compare"] = {
+            "against": previous.get("rev"),
+            # ratios across different scales are not a regression signal
+            "same_scale": previous.get("scale") == report["scale"],
+            "ratio": compare(report, previous),
+        }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{report['rev']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    print(f"results: {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
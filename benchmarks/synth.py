@@ -0,0 +1,183 @@
+"""
+Synthetic shona.snapshot.v3 documents at configurable scale, plus churn
+between consecutive snapshots.
+
+    python benchmarks/synth.py --out /tmp/snaps --count 3 --processes 10000 --sockets 50000
+
+Item shapes follow the real collectors (procfs processes, ss-style ports,
+Windows startup/tasks/services) so diff, ignore and io code paths behave as
+they do on a real host. Output is deterministic for a given --seed.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+DEFAULT_SCALE = {"processes": 10000, "sockets": 50000, "services": 2000, "tasks": 5000, "startup": 300}
+
+_WORDS = [
+    "svc", "host", "update", "agent", "helper", "sync", "daemon", "worker", "broker", "runtime",
+    "edge", "cloud", "office", "search", "index", "defender", "audio", "print", "net", "shell",
+]
+_DIRS = [
+    "C:\\Program Files\\{v}\\{p}", "C:\\Program Files (x86)\\{v}", "C:\\Windows\\System32",
+    "C:\\Users\\alice\\AppData\\Local\\{v}", "/usr/bin", "/usr/lib/{v}", "/opt/{v}/bin",
+]
+
+
+def _name(rng: random.Random, ext: str = "") -> str:
+    return "".join(rng.choice(_WORDS) for _ in range(2)) + str(rng.randint(0, 999)) + ext
+
+
+def _path(rng: random.Random, ext: str = ".exe") -> str:
+    d = rng.choice(_DIRS).format(v=rng.choice(_WORDS).title(), p=rng.choice(_WORDS))
+    sep = "/" if d.startswith("/") else "\\"
+    return f"{d}{sep}{_name(rng, ext)}"
+
+
+def _sha(rng: random.Random) -> str:
+    return hashlib.sha256(rng.getrandbits(64).to_bytes(8, "little")).hexdigest()
+
+
+def _process(rng: random.Random, pid: int) -> dict:
+    exe = _path(rng, "")
+    return {
+        "pid": pid,
+        "name": exe.rsplit("/", 1)[-1].rsplit("\\", 1)[-1][:15],
+        "ppid": rng.randint(1, pid),
+        "uid": rng.choice([0, 1000, 1001]),
+        "start_time": 1_760_000_000 + rng.randint(0, 86400),
+        "exe": exe,
+        "cmdline": f"{exe} --{rng.choice(_WORDS)}",
+        "exe_sha256": _sha(rng),
+    }
+
+
+def _socket(rng: random.Random, pid: int) -> dict:
+    # proto is TCP/UDP for both families; v6 shows in the address, as ss prints it
+    proto = rng.choice(["TCP", "TCP", "UDP"])
+    if rng.random() < 0.3:
+        local = f"{rng.choice(['*', '[::]', '[::1]'])}:{rng.randint(1, 65535)}"
+    else:
+        local = f"{rng.choice(['0.0.0.0', '127.0.0.1', '10.0.0.' + str(rng.randint(1, 254))])}:{rng.randint(1, 65535)}"
+    return {"proto": proto, "local": local, "pid": pid}
+
+
+def _startup(rng: random.Random) -> dict:
+    if rng.random() < 0.7:
+        return {
+            "source": "registry_run",
+            "key": rng.choice(["HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Run",
+                               "HKLM\\Software\\Microsoft\\Windows\\CurrentVersion\\Run"]),
+            "name": _name(rng),
+            "type": "REG_SZ",
+            "value": f'"{_path(rng)}" --background',
+            "sha256": _sha(rng),
+        }
+    return {"source": "startup_folder", "name": _name(rng, ".lnk"), "value": _path(rng, ".lnk"), "sha256": _sha(rng)}
+
+
+def _task(rng: random.Random) -> dict:
+    return {
+        "TaskName": f"\\{rng.choice(_WORDS).title()}\\{_name(rng)}",
+        "Next Run Time": "N/A",
+        "Status": rng.choice(["Ready", "Running", "Disabled"]),
+        "Task To Run": f"{_path(rng)} /{rng.choice(_WORDS)}",
+        "sha256": _sha(rng),
+    }
+
+
+def _service(rng: random.Random) -> dict:
+    name = _name(rng)
+    return {"service_name": name, "display_name": f"{name.title()} Service", "state": rng.choice(["RUNNING", "STOPPED"])}
+
+
+def generate(scale: dict | None = None, seed: int = 0, host: str = "synth-host", ts: str = "20260101_000000") -> dict:
+    """
+    One snapshot document with scale = {"processes", "sockets", "services", "tasks", "startup"}.
+    """
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    rng = random.Random(seed)
+    procs = [_process(rng, 100 + i) for i in range(scale["processes"])]
+    pids = [p["pid"] for p in procs] or [1]
+    sections = {
+        "processes": procs,
+        "listening_ports": [_socket(rng, rng.choice(pids)) for _ in range(scale["sockets"])],
+        "startup": [_startup(rng) for _ in range(scale["startup"])],
+        "scheduled_tasks": [_task(rng) for _ in range(scale["tasks"])],
+        "services": [_service(rng) for _ in range(scale["services"])],
+    }
+    return {
+        "schema": "shona.snapshot.v3",
+        "timestamp_utc": ts,
+        "system": {"hostname": host, "user": "bench", "os": "Windows", "os_release": "11", "os_version": "synthetic",
+                   "machine": "AMD64", "python": "3"},
+        **sections,
+        "collectors": {s: {"status": "ok", "ms": 0.0} for s in sections},
+        "scan_ms": 0.0,
+        "notes": "synthetic",
+    }
+
+
+def churn(snapshot: dict, rate: float = 0.02, seed: int = 1, minutes: int = 10) -> dict:
+    """
+    Next snapshot: per section, `rate` of the items are removed and as many new
+    ones added; for persistence items a further rate/10 keep their key but get
+    a new target hash (binary replaced in place). Timestamp moves by `minutes`.
+    """
+    rng = random.Random(seed)
+    out = copy.deepcopy(snapshot)
+    makers = {
+        "processes": lambda: _process(rng, rng.randint(100_000, 4_000_000)),
+        "listening_ports": lambda: _socket(rng, rng.randint(100, 4_000_000)),
+        "startup": lambda: _startup(rng),
+        "scheduled_tasks": lambda: _task(rng),
+        "services": lambda: _service(rng),
+    }
+    for section, make in makers.items():
+        items = out[section]
+        n = int(len(items) * rate)
+        for i in sorted(rng.sample(range(len(items)), min(n, len(items))), reverse=True):
+            items.pop(i)
+        items.extend(make() for _ in range(n))
+        if section in ("startup", "scheduled_tasks", "processes"):
+            field = "exe_sha256" if section == "processes" else "sha256"
+            for it in rng.sample(items, min(len(items), max(1, n // 10)) if items else 0):
+                it[field] = _sha(rng)
+    ts = datetime.strptime(snapshot["timestamp_utc"], "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc)
+    out["timestamp_utc"] = (ts + timedelta(minutes=minutes)).strftime("%Y%m%d_%H%M%S")
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True, help="Directory for the .json snapshots")
+    ap.add_argument("--count", type=int, default=2)
+    ap.add_argument("--churn", type=float, default=0.02)
+    ap.add_argument("--seed", type=int, default=0)
+    for k, v in DEFAULT_SCALE.items():
+        ap.add_argument(f"--{k}", type=int, default=v)
+    args = ap.parse_args()
+
+    from shona_core.utils.io import write_json
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    snap = generate({k: getattr(args, k) for k in DEFAULT_SCALE}, seed=args.seed)
+    for i in range(args.count):
+        if i:
+            snap = churn(snap, args.churn, seed=args.seed + i)
+        p = out / f"{snap['system']['hostname']}_{snap['timestamp_utc']}.json"
+        write_json(p, snap)
+        print(p)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,494 @@
 from __future__ import annotations
 
+import atexit
+import gzip
+import hashlib
 import json
+import os
+import queue
+import sys
+import threading
 import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterator
+
+from shona_core.utils.lock import file_lock
 
 AUDIT_DIR = Path(".shona/audit")
 AUDIT_FILE = AUDIT_DIR / "events.jsonl"
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# The active segment is AUDIT_FILE. Once it passes either limit it is closed:
+# gzipped into SEGMENT_DIR and summarised in INDEX_FILE (ts range + per-kind counts).
+SEGMENT_DIR = AUDIT_DIR / "segments"
+INDEX_FILE = AUDIT_DIR / "index.json"
+SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+SEGMENT_MAX_AGE = 7 * 24 * 3600
+
+# Writers from every process (CLI, web, tray) serialise on LOCK_FILE. Each record
+# carries "prev" = sha256 of the previous record's line; HEAD_FILE holds the hash
+# and count of the last committed record so truncation is detectable too.
+LOCK_FILE = AUDIT_DIR / "lock"
+HEAD_FILE = AUDIT_DIR / "head.json"
+GENESIS = "0" * 64
+MAX_BATCH = 256
 
 
 def _ensure() -> None:
     AUDIT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def log_event(kind: str, data: dict) -> None:
+def log_event(kind: str, data: dict, wait: bool = True) -> None:
+    """
+    Queues one event for the group-commit writer. With wait=True (default)
+    returns only after the batch holding it has been fsynced, and re-raises
+    the error if that commit failed.
+    """
     _ensure()
     event = {
         "ts": int(time.time()),
         "kind": kind,
         "data": data,
     }
-    with AUDIT_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event) + "\n")
+    ticket = _WRITER.submit(event)
+    if wait:
+        ticket.done.wait()
+        if ticket.error is not None:
+            raise ticket.error
 
 
-def tail(n: int = 50) -> list[dict]:
+# ----------------------------
+# Group-commit writer
+# ----------------------------
+_THREAD_LOCK = threading.RLock()
+
+
+class _Ticket:
+    """
+    Completion of one queued event: done is set once its batch is committed
+    or has failed (error then holds the exception).
+    """
+
+    __slots__ = ("done", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.error: BaseException | None = None
+
+
+@contextmanager
+def _locked() -> Iterator[None]:
+    """
+    In-process + cross-process exclusive lock around the audit store.
+    """
+    _ensure()
+    with _THREAD_LOCK, file_lock(LOCK_FILE):
+        yield
+
+
+def _line_hash(line: bytes) -> str:
+    return hashlib.sha256(line.rstrip(b"\n")).hexdigest()
+
+
+def _read_head() -> dict:
+    try:
+        return json.loads(HEAD_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        pass
+    # no head yet (fresh store or pre-chain log): chain on from the last line written
+    last = _tail_lines(AUDIT_FILE, 1) if AUDIT_FILE.exists() else []
+    if not last and SEGMENT_DIR.exists():
+        segments = _load_index()["segments"]
+        if segments:
+            last = [ln for ln in _segment_lines(segments[-1]["file"]) if ln.strip()][-1:]
+    if last:
+        return {"hash": _line_hash(last[0]), "count": 0}
+    return {"hash": GENESIS, "count": 0}
+
+
+def _write_head(head: dict) -> None:
+    tmp = HEAD_FILE.with_name(f"{HEAD_FILE.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(head))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, HEAD_FILE)
+
+
+def _commit(events: list[dict]) -> None:
+    with _locked():
+        _maybe_rotate(events[0]["ts"])
+        head = _read_head()
+        prev = head["hash"]
+        lines: list[bytes] = []
+        for ev in events:
+            ev["prev"] = prev
+            line = json.dumps(ev).encode("utf-8")
+            prev = _line_hash(line)
+            lines.append(line + b"\n")
+        with AUDIT_FILE.open("ab") as f:
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        _write_head({"hash": prev, "count": int(head.get("count", 0)) + len(events)})
+
+
+class _Writer:
+    """
+    One background thread per process. Events queued while a commit is in
+    flight are written together by the next one: one fsync per batch.
+    """
+
+    def __init__(self) -> None:
+        self._q: queue.Queue[tuple[dict, _Ticket]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, event: dict) -> _Ticket:
+        ticket = _Ticket()
+        self._q.put((event, ticket))
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="shona-audit", daemon=True)
+                    self._thread.start()
+        return ticket
+
+    def _drain(self, first: tuple[dict, _Ticket]) -> list[tuple[dict, _Ticket]]:
+        batch = [first]
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._drain(self._q.get())
+            try:
+                _commit([ev for ev, _ in batch])
+            except Exception as e:
+                # waiters re-raise it; wait=False callers only get this line
+                print(f"[shona] audit write failed: {e}", file=sys.stderr)
+                for _, ticket in batch:
+                    ticket.error = e
+            finally:
+                for _, ticket in batch:
+                    ticket.done.set()
+
+    def flush(self) -> None:
+        """
+        Commits anything still queued (events logged with wait=False).
+        """
+        pending = []
+        while True:
+            try:
+                pending.append(self._q.get_nowait())
+            except queue.Empty:
+                break
+        if pending:
+            try:
+                _commit([ev for ev, _ in pending])
+            except Exception as e:
+                for _, ticket in pending:
+                    ticket.error = e
+                raise
+            finally:
+                for _, ticket in pending:
+                    ticket.done.set()
+
+
+_WRITER = _Writer()
+atexit.register(_WRITER.flush)
+
+
+# ----------------------------
+# Segments + index
+# ----------------------------
+def _load_index() -> dict:
+    if INDEX_FILE.exists():
+        try:
+            return json.loads(INDEX_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+    return rebuild_index()
+
+
+def _save_index(index: dict) -> None:
+    tmp = INDEX_FILE.with_name(f"{INDEX_FILE.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    os.replace(tmp, INDEX_FILE)
+
+
+def _summarise(lines) -> dict:
+    ts_min = ts_max = None
+    count = 0
+    kinds: dict[str, int] = {}
+    for line in lines:
+        try:
+            ev = json.loads(line)
+        except Exception:
+            continue
+        ts = int(ev.get("ts", 0))
+        ts_min = ts if ts_min is None else min(ts_min, ts)
+        ts_max = ts if ts_max is None else max(ts_max, ts)
+        kind = str(ev.get("kind", ""))
+        kinds[kind] = kinds.get(kind, 0) + 1
+        count += 1
+    return {"ts_min": ts_min or 0, "ts_max": ts_max or 0, "count": count, "kinds": kinds}
+
+
+def rebuild_index() -> dict:
+    """
+    Re-summarises every closed segment. Used when index.json is missing or corrupt.
+    """
+    index: dict = {"segments": []}
+    if SEGMENT_DIR.exists():
+        for seg in sorted(SEGMENT_DIR.glob("*.jsonl.gz")):
+            with gzip.open(seg, "rb") as f:
+                index["segments"].append({"file": seg.name, **_summarise(f)})
+    index["segments"].sort(key=lambda s: (s["ts_min"], s["file"]))
     _ensure()
-    if not AUDIT_FILE.exists():
+    _save_index(index)
+    return index
+
+
+def _first_ts(path: Path) -> int | None:
+    try:
+        with path.open("rb") as f:
+            return int(json.loads(f.readline()).get("ts", 0))
+    except Exception:
+        return None
+
+
+def _maybe_rotate(now: int) -> None:
+    try:
+        size = AUDIT_FILE.stat().st_size
+    except FileNotFoundError:
+        return
+    if size < SEGMENT_MAX_BYTES:
+        first = _first_ts(AUDIT_FILE)
+        if first is None or now - first < SEGMENT_MAX_AGE:
+            return
+    _rotate_locked()
+
+
+def rotate() -> dict | None:
+    """
+    Closes the active segment: gzip into SEGMENT_DIR and add it to the index.
+    """
+    with _locked():
+        return _rotate_locked()
+
+
+def _rotate_locked() -> dict | None:
+    _ensure()
+    if not AUDIT_FILE.exists() or AUDIT_FILE.stat().st_size == 0:
+        return None
+    SEGMENT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # move aside first; the gzip below is the only copy written to SEGMENT_DIR
+    closing = AUDIT_DIR / f"closing.{os.getpid()}.{time.time_ns()}.jsonl"
+    try:
+        os.replace(AUDIT_FILE, closing)
+    except FileNotFoundError:
+        return None
+
+    # load (or rebuild) the index before the new segment exists so it is added once
+    index = _load_index()
+    raw = closing.read_bytes()
+    entry = _summarise(raw.splitlines())
+    name = f"events-{entry['ts_min']}-{entry['ts_max']}-{time.time_ns()}.jsonl.gz"
+    tmp = SEGMENT_DIR / f"{name}.tmp"
+    with gzip.open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, SEGMENT_DIR / name)
+    closing.unlink(missing_ok=True)
+
+    index["segments"].append({"file": name, **entry})
+    index["segments"].sort(key=lambda s: (s["ts_min"], s["file"]))
+    _save_index(index)
+    return {"file": name, **entry}
+
+
+def _segment_lines(name: str) -> list[bytes]:
+    try:
+        with gzip.open(SEGMENT_DIR / name, "rb") as f:
+            return f.read().splitlines()
+    except FileNotFoundError:
         return []
-    lines = AUDIT_FILE.read_text(encoding="utf-8", errors="ignore").splitlines()
+
+
+# ----------------------------
+# Readers
+# ----------------------------
+def _tail_lines(path: Path, n: int) -> list[bytes]:
+    """
+    Last n non-empty lines of path, reading fixed-size blocks backwards from
+    the end. Never loads more than needed to find n complete lines.
+    """
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        lines: list[bytes] = []
+        while pos > 0:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            lines = buf.split(b"\n")
+            if pos > 0:
+                # first piece may be a fragment of a line that started before pos
+                lines = lines[1:]
+            if sum(1 for ln in lines if ln.strip()) >= n:
+                break
+    return [ln for ln in lines if ln.strip()][-n:]
+
+
+def _parse(lines: list[bytes]) -> list[dict]:
     out = []
-    for line in lines[-max(1, min(n, 500)):]:
+    for line in lines:
         try:
             out.append(json.loads(line))
         except Exception:
             continue
     return out
+
+
+def tail(n: int = 50) -> list[dict]:
+    _ensure()
+    n = max(1, min(n, 500))
+    lines = _tail_lines(AUDIT_FILE, n) if AUDIT_FILE.exists() else []
+    if len(lines) < n and SEGMENT_DIR.exists():
+        # active segment was just rotated: continue into the newest closed ones
+        for seg in reversed(_load_index()["segments"]):
+            older = [ln for ln in _segment_lines(seg["file"]) if ln.strip()]
+            lines = older[-(n - len(lines)):] + lines
+            if len(lines) >= n:
+                break
+    return _parse(lines)
+
+
+def parse_time(value: str | None) -> int | None:
+    """
+    Epoch seconds, or an ISO date/time (UTC if no offset given).
+    """
+    if value is None or value == "":
+        return None
+    if value.isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def search(kind: str | None = None, since: int | None = None, until: int | None = None, limit: int = 500) -> dict:
+    """
+    Events matching kind within [since, until], oldest first. Only segments whose
+    indexed ts range overlaps (and that contain the kind) are opened.
+    """
+    _ensure()
+    lo = since if since is not None else 0
+    hi = until if until is not None else 2**63
+
+    def wanted(ev: dict) -> bool:
+        ts = int(ev.get("ts", 0))
+        return lo <= ts <= hi and (kind is None or ev.get("kind") == kind)
+
+    def sources():
+        for seg in _load_index()["segments"]:
+            if seg["ts_max"] < lo or seg["ts_min"] > hi:
+                continue
+            if kind is not None and not seg["kinds"].get(kind):
+                continue
+            yield _segment_lines(seg["file"])
+        first = _first_ts(AUDIT_FILE) if AUDIT_FILE.exists() else None
+        if first is not None and first <= hi:
+            yield AUDIT_FILE.read_bytes().splitlines()
+
+    items: list[dict] = []
+    opened = 0
+    truncated = False
+    for lines in sources():
+        opened += 1
+        for ev in _parse(lines):
+            if not wanted(ev):
+                continue
+            if len(items) >= limit:
+                truncated = True
+                break
+            items.append(ev)
+        if truncated:
+            break
+
+    return {"ok": True, "items": items, "segments_opened": opened, "truncated": truncated}
+
+
+def verify() -> dict:
+    """
+    Walks every segment in order plus the active file, re-hashing each line and
+    checking its "prev" link, then compares the final hash with head.json.
+    Records written before chaining existed are counted as legacy, not errors.
+    """
+    _ensure()
+    problems: list[str] = []
+    warnings: list[str] = []
+    head: dict | None = None
+    if HEAD_FILE.exists():
+        try:
+            head = json.loads(HEAD_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            problems.append("head.json unreadable")
+    head_hash = (head or {}).get("hash")
+
+    records = legacy = 0
+    prev: str | None = None
+    chained = False
+    head_seen = False
+
+    def check(where: str, lines: list[bytes]) -> None:
+        nonlocal records, legacy, prev, chained, head_seen
+        for i, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            records += 1
+            try:
+                ev = json.loads(line)
+            except Exception:
+                ev = None
+                problems.append(f"{where}:{i}: unparseable record")
+            if ev is not None and "prev" in ev:
+                if ev["prev"] != (prev or GENESIS):
+                    problems.append(f"{where}:{i}: prev hash mismatch (record altered, removed or reordered)")
+                chained = True
+            elif ev is not None:
+                if chained:
+                    problems.append(f"{where}:{i}: unchained record after chain start")
+                legacy += 1
+            prev = _line_hash(line)
+            head_seen = head_seen or prev == head_hash
+
+    for seg in _load_index()["segments"]:
+        check(seg["file"], _segment_lines(seg["file"]))
+    if AUDIT_FILE.exists():
+        check(AUDIT_FILE.name, AUDIT_FILE.read_bytes().splitlines())
+
+    if head_hash and head_hash != GENESIS and head_hash != prev:
+        if head_seen:
+            # log fsynced but head.json not yet replaced when the writer stopped
+            warnings.append("head.json is behind the log (interrupted commit)")
+        else:
+            problems.append("last record does not match head.json (log truncated or rewritten)")
+
+    return {
+        "ok": not problems,
+        "records": records,
+        "legacy_unchained": legacy,
+        "problems": problems[:50],
+        "problem_count": len(problems),
+        "warnings": warnings,
+    }
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+from shona_core.utils.io import SNAPSHOT_SUFFIXES, list_files_sorted, read_snapshot
+
+RUNTIME_DIR = Path(".shona")
+SNAP_DIR = RUNTIME_DIR / "snapshots"
+CATALOG_FILE = RUNTIME_DIR / "catalog.sqlite3"
+
+# sections whose item counts are kept per snapshot
+COUNTED_SECTIONS = ["processes", "listening_ports", "startup", "scheduled_tasks", "services"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    path TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    ts_epoch INTEGER NOT NULL,
+    schema TEXT,
+    sha256 TEXT,
+    counts TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    ino INTEGER
+);
+CREATE INDEX IF NOT EXISTS snapshots_host_ts ON snapshots (host, ts_epoch);
+"""
+
+# file signature stored beside sha256, so the hash is only trusted while the
+# file at that path is still the one that was hashed
+_STAT_COLUMNS = {"size": "INTEGER", "mtime_ns": "INTEGER", "ino": "INTEGER"}
+
+
+def _ts_epoch(ts: str) -> int:
+    """
+    Snapshot timestamps are utc_now_compact() strings: YYYYmmdd_HHMMSS.
+    """
+    try:
+        return int(datetime.strptime(ts, "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+def _connect() -> sqlite3.Connection:
+    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(CATALOG_FILE), timeout=10)
+    con.row_factory = sqlite3.Row
+    con.executescript(_SCHEMA)
+    have = {r["name"] for r in con.execute("PRAGMA table_info(snapshots)")}
+    for col, kind in _STAT_COLUMNS.items():
+        if col not in have:
+            # catalogs from before the signature columns; rows get them on next record/rebuild
+            con.execute(f"ALTER TABLE snapshots ADD COLUMN {col} {kind}")
+    return con
+
+
+def signature(st: os.stat_result) -> dict:
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "ino": st.st_ino}
+
+
+def hash_is_current(row: dict | None, path: Path) -> bool:
+    """
+    True when row's sha256 still describes the file at path (same size, mtime, inode).
+    """
+    if not row or not row.get("sha256"):
+        return False
+    try:
+        sig = signature(path.stat())
+    except OSError:
+        return False
+    return all(row.get(k) == v for k, v in sig.items())
+
+
+def _row_dict(row: sqlite3.Row) -> dict:
+    d = dict(row)
+    d["counts"] = json.loads(d["counts"] or "{}")
+    return d
+
+
+def _upsert(con: sqlite3.Connection, path: Path, snapshot: dict, sha256: str, st: os.stat_result) -> dict:
+    ts = str(snapshot.get("timestamp_utc", ""))
+    row = {
+        "path": str(path),
+        "host": str((snapshot.get("system") or {}).get("hostname", "")),
+        "ts": ts,
+        "ts_epoch": _ts_epoch(ts),
+        "schema": snapshot.get("schema"),
+        "sha256": sha256,
+        "counts": json.dumps(snapshot.get("counts") or {s: len(snapshot.get(s) or []) for s in COUNTED_SECTIONS}),
+        **signature(st),
+    }
+    con.execute(
+        "INSERT OR REPLACE INTO snapshots (path, host, ts, ts_epoch, schema, sha256, counts, size, mtime_ns, ino) "
+        "VALUES (:path, :host, :ts, :ts_epoch, :schema, :sha256, :counts, :size, :mtime_ns, :ino)",
+        row,
+    )
+    return row
+
+
+def _is_empty() -> bool:
+    with closing(_connect()) as con:
+        return con.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone() is None
+
+
+def record(path: Path, snapshot: dict) -> dict:
+    """
+    Adds (or refreshes) one snapshot in the catalog. Called by run_scan after writing.
+    """
+    if _is_empty():
+        # first scan with a catalog: pick up older snapshots too
+        rebuild()
+        return get(path) or {}
+    # stat before reading: a change in between leaves a stale signature, never a stale hash
+    st = path.stat()
+    sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+    with closing(_connect()) as con, con:
+        row = _upsert(con, path, snapshot, sha256, st)
+    return row
+
+
+def rebuild() -> dict:
+    """
+    Re-indexes every snapshot file in SNAP_DIR from scratch.
+    """
+    indexed = 0
+    skipped: list[str] = []
+    with closing(_connect()) as con, con:
+        con.execute("DELETE FROM snapshots")
+        for p in list_files_sorted(SNAP_DIR, SNAPSHOT_SUFFIXES):
+            try:
+                st = p.stat()
+                raw = p.read_bytes()
+                if p.name.endswith(".json"):
+                    snapshot = json.loads(raw)
+                else:
+                    # .snapz/.snapm: header + system only, counts are stored in the header
+                    snapshot = read_snapshot(p, sections=["system"])
+            except Exception:
+                skipped.append(p.name)
+                continue
+            _upsert(con, p, snapshot, hashlib.sha256(raw).hexdigest(), st)
+            indexed += 1
+    return {"ok": True, "indexed": indexed, "skipped": skipped, "catalog": str(CATALOG_FILE)}
+
+
+def _query(sql: str, params: tuple) -> list[dict]:
+    if _is_empty() and list_files_sorted(SNAP_DIR, SNAPSHOT_SUFFIXES):
+        # first use on an existing snapshots dir: index what is already there
+        rebuild()
+
+    with closing(_connect()) as con:
+        rows = [_row_dict(r) for r in con.execute(sql, params)]
+        missing = [r["path"] for r in rows if not Path(r["path"]).exists()]
+        if missing:
+            # file deleted behind our back; drop the stale rows and ask again
+            with con:
+                con.executemany("DELETE FROM snapshots WHERE path = ?", [(m,) for m in missing])
+    if missing:
+        return _query(sql, params)
+    return rows
+
+
+def latest(host: str, n: int = 1) -> list[dict]:
+    """
+    Newest n snapshots for host, oldest first.
+    """
+    rows = _query(
+        "SELECT * FROM snapshots WHERE host = ? ORDER BY ts_epoch DESC, path DESC LIMIT ?",
+        (host, max(1, n)),
+    )
+    return list(reversed(rows))
+
+
+def nearest(host: str, ts_epoch: int) -> dict | None:
+    """
+    Snapshot for host closest in time to ts_epoch (either side).
+    """
+    before = _query(
+        "SELECT * FROM snapshots WHERE host = ? AND ts_epoch <= ? ORDER BY ts_epoch DESC LIMIT 1",
+        (host, ts_epoch),
+    )
+    after = _query(
+        "SELECT * FROM snapshots WHERE host = ? AND ts_epoch >= ? ORDER BY ts_epoch ASC LIMIT 1",
+        (host, ts_epoch),
+    )
+    cands = before + after
+    if not cands:
+        return None
+    return min(cands, key=lambda r: abs(r["ts_epoch"] - ts_epoch))
+
+
+def get(path: Path | str) -> dict | None:
+    rows = _query("SELECT * FROM snapshots WHERE path = ?", (str(Path(path)),))
+    return rows[0] if rows else None
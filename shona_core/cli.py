@@ -6,16 +6,8 @@ import os
 import sys
 from pathlib import Path
 
-from shona_core.audit import log_event, tail as audit_tail
-from shona_core.diff import diff_against_baseline, diff_latest_two
-from shona_core.modules.ports import list_listening_ports
-from shona_core.modules.processes import list_processes
-from shona_core.owner import owner_init, owner_verify, require_token
-from shona_core.retention import baseline_set, ignore_add, load_ignore
-from shona_core.risk import score_diff
-from shona_core.scan import run_scan
-from shona_core.settings import load_settings, set_setting
-from shona_core.voice import listen_ptt, speak, voice_status
+# Each command imports what it needs: `shona status` or `shona audit show`
+# should not pay for scan, diff or voice imports (see benchmarks/bench_cli_import.py).
 
 RUNTIME_DIR = Path(".shona")
 STATE_DIR = RUNTIME_DIR / "state"
@@ -31,35 +23,127 @@ def _ensure_runtime() -> None:
 # ----------------------------
 # Core commands
 # ----------------------------
-def cmd_scan() -> int:
+def _via_daemon(cmd: str, args: dict, local: bool, fallback_on_error: bool = True):
+    """
+    The daemon's result for cmd, or None to run it in this process (--local,
+    no daemon listening, or a failed read-only request). With
+    fallback_on_error=False a failure after connecting raises RuntimeError
+    instead, since the daemon may still be running the command.
+    """
+    if local:
+        return None
+    from shona_core.daemon import call
+
+    res = call(cmd, args)
+    if res is None:
+        return None
+    if res.get("ok"):
+        return res["result"]
+    if fallback_on_error:
+        return None
+    raise RuntimeError(res.get("message") or f"daemon {cmd} failed")
+
+
+def cmd_scan(sequential: bool = False, local: bool = False) -> int:
     _ensure_runtime()
-    path = run_scan()
+    try:
+        # no second scan on a timeout/error: the daemon's may still be running
+        res = _via_daemon("scan", {"sequential": sequential}, local, fallback_on_error=False)
+    except RuntimeError as e:
+        print(json.dumps({"ok": False, "message": str(e)}, indent=2))
+        return 1
+    if res is not None:
+        print(res["snapshot"])
+        return 0
+
+    from shona_core.scan import run_scan
+
+    path = run_scan(concurrent=not sequential)
     print(path)
     return 0
 
 
-def cmd_diff(use_baseline: bool) -> int:
+def cmd_diff(use_baseline: bool, local: bool = False) -> int:
     _ensure_runtime()
-    d = diff_against_baseline() if use_baseline else diff_latest_two()
-    r = score_diff(d)
-    out = {"diff": d, "risk": r}
+    out = _via_daemon("diff", {"baseline": use_baseline}, local)
+    if out is None:
+        from shona_core.diff import diff_against_baseline, diff_latest_two
+        from shona_core.risk import score_diff
+
+        d = diff_against_baseline() if use_baseline else diff_latest_two()
+        r = score_diff(d)
+        out = {"diff": d, "risk": r}
     print(json.dumps(out, indent=2))
-    return 0 if d.get("ok") else 2
+    return 0 if out["diff"].get("ok") else 2
+
 
+def cmd_ps(limit: int, local: bool = False) -> int:
+    procs = _via_daemon("ps", {}, local)
+    if procs is None:
+        from shona_core.modules.processes import list_processes
 
-def cmd_ps(limit: int) -> int:
-    procs = list_processes()
+        procs = list_processes()
     procs = procs[: max(1, min(limit, 200))] if limit else procs
     print(json.dumps(procs, indent=2))
     return 0
 
 
-def cmd_ports() -> int:
-    ports = list_listening_ports()
+def cmd_ports(local: bool = False) -> int:
+    ports = _via_daemon("ports", {}, local)
+    if ports is None:
+        from shona_core.modules.ports import list_listening_ports
+
+        ports = list_listening_ports()
     print(json.dumps(ports, indent=2))
     return 0
 
 
+def cmd_watch(interval: float, heartbeat: float, cycles: int | None) -> int:
+    _ensure_runtime()
+    from shona_core.watch import watch
+
+    def emit(event: dict) -> None:
+        print(json.dumps(event), flush=True)
+
+    try:
+        watch(interval=max(1.0, interval), heartbeat=max(interval, heartbeat), on_event=emit, cycles=cycles)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_index_rebuild() -> int:
+    _ensure_runtime()
+    from shona_core.catalog import rebuild
+
+    print(json.dumps(rebuild(), indent=2))
+    return 0
+
+
+def cmd_index_gc() -> int:
+    _ensure_runtime()
+    from shona_core.utils.blobs import gc
+    from shona_core.utils.hashing import prune_cache
+    from shona_core.utils.io import SNAPM_SUFFIX, list_files_sorted
+
+    res = gc(list_files_sorted(RUNTIME_DIR / "snapshots", SNAPM_SUFFIX))
+    # target hashes of binaries not seen in a scan for a while (replaced/deleted files)
+    res["hash_cache_pruned"] = prune_cache()
+    print(json.dumps(res, indent=2))
+    return 0 if res.get("ok") else 2
+
+
+def cmd_index_list(host: str | None, limit: int) -> int:
+    _ensure_runtime()
+    import socket
+
+    from shona_core.catalog import latest
+
+    items = latest(host or socket.gethostname(), max(1, min(limit, 500)))
+    print(json.dumps({"ok": True, "items": items}, indent=2))
+    return 0
+
+
 # ----------------------------
 # Defender (Windows persistence)
 # ----------------------------
@@ -117,18 +201,24 @@ def cmd_services_suspicious() -> int:
 # Retention: ignore + baseline
 # ----------------------------
 def cmd_ignore_add(kind: str, value: str) -> int:
+    from shona_core.retention import ignore_add
+
     data = ignore_add(kind, value)
     print(json.dumps({"ok": True, "ignore": data}, indent=2))
     return 0
 
 
 def cmd_ignore_list() -> int:
-    print(json.dumps({"ok": True, "ignore": load_ignore()}, indent=2))
+    from shona_core.retention import ignore_matcher, load_ignore
+
+    print(json.dumps({"ok": True, "ignore": load_ignore(), "invalid_rules": ignore_matcher().errors}, indent=2))
     return 0
 
 
 def cmd_baseline_accept(snapshot: str) -> int:
     _ensure_runtime()
+    from shona_core.retention import baseline_set
+
     p = Path(snapshot)
     if not p.exists():
         alt = Path(".shona/snapshots") / snapshot
@@ -146,6 +236,9 @@ def cmd_baseline_accept(snapshot: str) -> int:
 # Owner verification + audit
 # ----------------------------
 def cmd_owner_init(pin: str) -> int:
+    from shona_core.audit import log_event
+    from shona_core.owner import owner_init
+
     res = owner_init(pin)
     print(json.dumps(res, indent=2))
     log_event("owner_init", {"ok": bool(res.get("ok"))})
@@ -153,13 +246,38 @@ def cmd_owner_init(pin: str) -> int:
 
 
 def cmd_owner_verify(pin: str, ttl: int) -> int:
+    from shona_core.audit import log_event
+    from shona_core.owner import owner_verify
+
     res = owner_verify(pin, ttl_seconds=ttl)
     print(json.dumps(res, indent=2))
     log_event("owner_verify", {"ok": bool(res.get("ok")), "ttl": ttl})
     return 0 if res.get("ok") else 2
 
 
+def cmd_audit_search(kind: str | None, since: str | None, until: str | None, limit: int) -> int:
+    from shona_core.audit import parse_time, search
+
+    try:
+        lo, hi = parse_time(since), parse_time(until)
+    except ValueError as e:
+        print(json.dumps({"ok": False, "message": f"bad time: {e}"}, indent=2))
+        return 2
+    print(json.dumps(search(kind=kind, since=lo, until=hi, limit=max(1, min(limit, 10000))), indent=2))
+    return 0
+
+
+def cmd_audit_verify() -> int:
+    from shona_core.audit import verify
+
+    res = verify()
+    print(json.dumps(res, indent=2))
+    return 0 if res.get("ok") else 2
+
+
 def cmd_audit_show(tail_n: int) -> int:
+    from shona_core.audit import tail as audit_tail
+
     items = audit_tail(max(1, min(tail_n, 500)))
     print(json.dumps({"ok": True, "items": items}, indent=2))
     return 0
@@ -169,6 +287,9 @@ def cmd_audit_show(tail_n: int) -> int:
 # Safe Actions (owner token required)
 # ----------------------------
 def cmd_startup_disable(name: str, token: str) -> int:
+    from shona_core.audit import log_event
+    from shona_core.owner import require_token
+
     chk = require_token(token)
     if not chk.get("ok"):
         print(json.dumps(chk, indent=2))
@@ -184,6 +305,9 @@ def cmd_startup_disable(name: str, token: str) -> int:
 
 
 def cmd_tasks_disable(taskname: str, token: str) -> int:
+    from shona_core.audit import log_event
+    from shona_core.owner import require_token
+
     chk = require_token(token)
     if not chk.get("ok"):
         print(json.dumps(chk, indent=2))
@@ -199,6 +323,9 @@ def cmd_tasks_disable(taskname: str, token: str) -> int:
 
 
 def cmd_services_stop(service: str, token: str) -> int:
+    from shona_core.audit import log_event
+    from shona_core.owner import require_token
+
     chk = require_token(token)
     if not chk.get("ok"):
         print(json.dumps(chk, indent=2))
@@ -217,11 +344,15 @@ def cmd_services_stop(service: str, token: str) -> int:
 # Settings + Voice (Friend Mode)
 # ----------------------------
 def cmd_config_get() -> int:
+    from shona_core.settings import load_settings
+
     print(json.dumps({"ok": True, "settings": load_settings()}, indent=2))
     return 0
 
 
 def cmd_config_set(key: str, value: str) -> int:
+    from shona_core.settings import set_setting
+
     # simple type parsing
     v = value
     if isinstance(value, str) and value.lower() in ["true", "false"]:
@@ -241,22 +372,32 @@ def cmd_config_set(key: str, value: str) -> int:
 
 
 def cmd_voice_status() -> int:
+    from shona_core.voice import voice_status
+
     st = voice_status()
     print(json.dumps({"ok": True, "tts_ok": st.tts_ok, "stt_ok": st.stt_ok, "message": st.message}, indent=2))
     return 0
 
 
 def cmd_voice_say(text: str) -> int:
+    from shona_core.voice import speak
+
     res = speak(text)
     print(json.dumps(res, indent=2))
     return 0 if res.get("ok") else 2
 
 
 def cmd_voice_talk_ptt(seconds: int) -> int:
+    from shona_core.voice import listen_ptt, speak
+
     seconds = max(1, min(int(seconds), 20))
-    print(json.dumps({"ok": True, "message": f"Listening for {seconds}s (push-to-talk)…"}, indent=2))
+    print(json.dumps({"ok": True, "message": f"Listening for up to {seconds}s (push-to-talk, stops when you pause)…"}, indent=2))
+
+    def show_partial(text: str) -> None:
+        print(f"\r… {text}", end="", file=sys.stderr, flush=True)
 
-    r = listen_ptt(seconds=seconds)
+    r = listen_ptt(seconds=seconds, on_partial=show_partial)
+    print(file=sys.stderr)
     print(json.dumps(r, indent=2))
 
     if r.get("ok") and r.get("text"):
@@ -286,7 +427,11 @@ def _is_web_running() -> bool:
 
 def cmd_status() -> int:
     _ensure_runtime()
+    from shona_core.daemon import ping
+    from shona_core.settings import load_settings
+
     status = {
+        "daemon": ping(),
         "web_running": _is_web_running(),
         "web_url": URL_FILE.read_text(encoding="utf-8").strip() if URL_FILE.exists() else None,
         "settings": load_settings(),
@@ -363,6 +508,70 @@ def cmd_web_stop() -> int:
     return 0
 
 
+def cmd_daemon_run() -> int:
+    _ensure_runtime()
+    from shona_core.daemon import serve
+
+    try:
+        res = serve()
+    except KeyboardInterrupt:
+        res = {"ok": True, "message": "daemon stopped"}
+    print(json.dumps(res, indent=2))
+    return 0 if res.get("ok") else 2
+
+
+def cmd_daemon_start() -> int:
+    _ensure_runtime()
+    from shona_core.daemon import SOCKET_PATH, ping, supported
+
+    if not supported():
+        print(json.dumps({"ok": False, "message": "daemon needs Unix domain sockets; commands run in-process"}, indent=2))
+        return 2
+    if ping() is not None:
+        print("[OK] Daemon already running.")
+        return 0
+
+    import subprocess
+    import time
+
+    subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "shona_core.daemon"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if ping() is not None:
+            print(f"[OK] Daemon started: {SOCKET_PATH}")
+            return 0
+        time.sleep(0.1)
+    print("[WARN] Daemon did not come up; commands keep running in-process.")
+    return 2
+
+
+def cmd_daemon_stop() -> int:
+    from shona_core.daemon import call
+
+    res = call("shutdown", timeout=5.0)
+    if res is None:
+        print("[OK] Daemon not running.")
+    elif res.get("ok"):
+        print("[OK] Daemon stopped.")
+    else:
+        print(f"[WARN] Daemon did not stop: {res.get('message')}")
+        return 1
+    return 0
+
+
+def cmd_daemon_status() -> int:
+    from shona_core.daemon import SOCKET_PATH, ping
+
+    info = ping()
+    print(json.dumps({"ok": True, "running": info is not None, "socket": str(SOCKET_PATH), "daemon": info}, indent=2))
+    return 0
+
+
 def cmd_tray() -> int:
     _ensure_runtime()
     from shona_core.tray import run_tray
@@ -373,13 +582,28 @@ def cmd_tray() -> int:
 
 def main() -> None:
     parser = argparse.ArgumentParser(prog="shona", description="SHONA - local-first cybersecurity assistant")
+    parser.add_argument("--local", action="store_true", help="Run scan/diff/ps/ports in this process even if the daemon is up")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
-    sub.add_parser("scan", help="Create a new security snapshot")
+    scan_p = sub.add_parser("scan", help="Create a new security snapshot")
+    scan_p.add_argument("--sequential", action="store_true", help="Run collectors one after another (no thread pool)")
 
     diff_p = sub.add_parser("diff", help="Diff snapshots")
     diff_p.add_argument("--baseline", action="store_true", help="Diff latest snapshot against accepted baseline")
 
+    watch_p = sub.add_parser("watch", help="Monitor continuously; print scored changes as JSON lines")
+    watch_p.add_argument("--interval", type=float, default=60.0, help="Seconds between collections")
+    watch_p.add_argument("--heartbeat", type=float, default=3600.0, help="Save a snapshot at least this often")
+    watch_p.add_argument("--cycles", type=int, default=None, help="Stop after N collections")
+
+    index_p = sub.add_parser("index", help="Snapshot catalog")
+    index_sub = index_p.add_subparsers(dest="index_cmd", required=True)
+    index_sub.add_parser("rebuild", help="Re-index every snapshot in .shona/snapshots")
+    index_sub.add_parser("gc", help="Delete unreferenced section blobs and stale file-hash cache entries")
+    il = index_sub.add_parser("list", help="Latest snapshots for a host")
+    il.add_argument("--host", type=str, default=None, help="Defaults to this machine")
+    il.add_argument("--limit", type=int, default=20)
+
     ps_p = sub.add_parser("ps", help="List running processes")
     ps_p.add_argument("--limit", type=int, default=50)
 
@@ -414,8 +638,16 @@ def main() -> None:
     ignore_p = sub.add_parser("ignore", help="Ignore list to reduce noise")
     ignore_sub = ignore_p.add_subparsers(dest="ignore_cmd", required=True)
     ignore_add_p = ignore_sub.add_parser("add", help="Add ignore entry")
-    ignore_add_p.add_argument("kind", choices=["processes", "ports"], help="Ignore category")
-    ignore_add_p.add_argument("value", type=str, help="Value to ignore (exact match)")
+    ignore_add_p.add_argument(
+        "kind",
+        choices=["processes", "ports", "startup", "scheduled_tasks", "services", "paths"],
+        help="Ignore category",
+    )
+    ignore_add_p.add_argument(
+        "value",
+        type=str,
+        help="Exact item, or glob:<pattern>, re:<regex>; ports also cidr:<net>, port:[proto:]<lo>-<hi>",
+    )
     ignore_sub.add_parser("list", help="Show ignore list")
 
     baseline_p = sub.add_parser("baseline", help="Baseline control")
@@ -436,6 +668,12 @@ def main() -> None:
     audit_sub = audit_p.add_subparsers(dest="audit_cmd", required=True)
     ash = audit_sub.add_parser("show", help="Show recent audit events")
     ash.add_argument("--tail", type=int, default=50)
+    audit_sub.add_parser("verify", help="Check the audit hash chain for tampering or truncation")
+    asr = audit_sub.add_parser("search", help="Search audit events by kind and time range")
+    asr.add_argument("--kind", type=str, default=None, help="e.g. startup_disable, owner_verify")
+    asr.add_argument("--since", type=str, default=None, help="Epoch seconds or ISO time (UTC if no offset)")
+    asr.add_argument("--until", type=str, default=None, help="Epoch seconds or ISO time (UTC if no offset)")
+    asr.add_argument("--limit", type=int, default=500)
 
     # Friend mode: settings + voice
     config_p = sub.add_parser("config", help="Settings")
@@ -464,19 +702,35 @@ def main() -> None:
     web_sub.add_parser("open", help="Open web UI in browser")
     web_sub.add_parser("stop", help="Stop web UI server")
 
+    daemon_p = sub.add_parser("daemon", help="Resident process serving scan/diff/ps/ports over a local socket")
+    daemon_sub = daemon_p.add_subparsers(dest="daemon_cmd", required=True)
+    daemon_sub.add_parser("start", help="Start the daemon in the background")
+    daemon_sub.add_parser("stop", help="Stop the daemon")
+    daemon_sub.add_parser("status", help="Show whether the daemon is up")
+    daemon_sub.add_parser("run", help="Run the daemon in the foreground")
+
     sub.add_parser("tray", help="Run SHONA tray app")
 
     args = parser.parse_args()
 
     rc = 0
     if args.cmd == "scan":
-        rc = cmd_scan()
+        rc = cmd_scan(args.sequential, args.local)
     elif args.cmd == "diff":
-        rc = cmd_diff(args.baseline)
+        rc = cmd_diff(args.baseline, args.local)
+    elif args.cmd == "watch":
+        rc = cmd_watch(args.interval, args.heartbeat, args.cycles)
+    elif args.cmd == "index":
+        if args.index_cmd == "rebuild":
+            rc = cmd_index_rebuild()
+        elif args.index_cmd == "gc":
+            rc = cmd_index_gc()
+        else:
+            rc = cmd_index_list(args.host, args.limit)
     elif args.cmd == "ps":
-        rc = cmd_ps(args.limit)
+        rc = cmd_ps(args.limit, args.local)
     elif args.cmd == "ports":
-        rc = cmd_ports()
+        rc = cmd_ports(args.local)
     elif args.cmd == "startup":
         if args.startup_cmd == "list":
             rc = cmd_startup_list()
@@ -507,7 +761,12 @@ def main() -> None:
         else:
             rc = cmd_owner_verify(args.pin, args.ttl)
     elif args.cmd == "audit":
-        rc = cmd_audit_show(args.tail)
+        if args.audit_cmd == "verify":
+            rc = cmd_audit_verify()
+        elif args.audit_cmd == "search":
+            rc = cmd_audit_search(args.kind, args.since, args.until, args.limit)
+        else:
+            rc = cmd_audit_show(args.tail)
     elif args.cmd == "config":
         if args.config_cmd == "get":
             rc = cmd_config_get()
@@ -529,6 +788,15 @@ def main() -> None:
             rc = cmd_web_open()
         elif args.webcmd == "stop":
             rc = cmd_web_stop()
+    elif args.cmd == "daemon":
+        if args.daemon_cmd == "start":
+            rc = cmd_daemon_start()
+        elif args.daemon_cmd == "stop":
+            rc = cmd_daemon_stop()
+        elif args.daemon_cmd == "status":
+            rc = cmd_daemon_status()
+        else:
+            rc = cmd_daemon_run()
     elif args.cmd == "tray":
         rc = cmd_tray()
 
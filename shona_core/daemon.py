@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+# Local control socket: newline-delimited JSON, one request and one response
+# per connection. Request {"cmd": "...", "args": {...}}; response
+# {"ok": true, "result": ...} or {"ok": false, "message": "..."}.
+# The socket file is created 0600, so only the owning user can connect.
+SOCKET_PATH = Path(".shona/state/shona.sock")
+
+CONNECT_TIMEOUT = 0.5
+# long enough for a full scan; the server side has its own collector budgets
+REQUEST_TIMEOUT = 300.0
+# read-only commands answer from warm caches; past this a hung daemon costs
+# less than running the command in process
+READ_TIMEOUT = 5.0
+COMMAND_TIMEOUTS = {"scan": REQUEST_TIMEOUT}
+
+COMMANDS = ("ping", "scan", "diff", "ps", "ports", "shutdown")
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and not sys.platform.startswith("win")
+
+
+# ----------------------------
+# Client
+# ----------------------------
+def call(cmd: str, args: dict | None = None, timeout: float | None = None) -> dict | None:
+    """
+    Sends one request to the daemon. None only when no daemon accepts the
+    connection (no socket, stale socket), so callers can run the command in
+    process instead. Once connected, a timeout or garbled reply comes back as
+    {"ok": false, ...}: the daemon may still be doing the work. timeout
+    defaults per command (COMMAND_TIMEOUTS, else READ_TIMEOUT).
+    """
+    if timeout is None:
+        timeout = COMMAND_TIMEOUTS.get(cmd, READ_TIMEOUT)
+    if not supported() or not SOCKET_PATH.exists():
+        return None
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.settimeout(CONNECT_TIMEOUT)
+        try:
+            s.connect(str(SOCKET_PATH))
+        except OSError:
+            return None
+        s.settimeout(timeout)
+        s.sendall(json.dumps({"cmd": cmd, "args": args or {}}).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            line = f.readline()
+        if not line:
+            return {"ok": False, "message": "daemon closed the connection without a reply"}
+        return json.loads(line)
+    except socket.timeout:
+        return {"ok": False, "message": f"no reply from daemon within {timeout:g}s"}
+    except (OSError, ValueError) as e:
+        return {"ok": False, "message": f"daemon request failed: {e}"}
+    finally:
+        s.close()
+
+
+def ping() -> dict | None:
+    res = call("ping", timeout=2.0)
+    return res.get("result") if res and res.get("ok") else None
+
+
+# ----------------------------
+# Server
+# ----------------------------
+class _Handlers:
+    """
+    Command implementations backed by process-lifetime state: live listings
+    share a TTL cache, diffs hit the warm diff caches, scans run one at a time.
+    A hosting process (the web app) passes in its own caches and scan runner
+    so both front ends share them.
+    """
+
+    def __init__(self, ps_cache=None, ports_cache=None, scan: Callable[[bool], str] | None = None) -> None:
+        from shona_core.modules.ports import list_listening_ports
+        from shona_core.modules.processes import list_processes
+        from shona_core.utils.cache import TTLCache
+
+        self.started = time.time()
+        self._ps = ps_cache or TTLCache(list_processes)
+        self._ports = ports_cache or TTLCache(list_listening_ports)
+        self._scan = scan or self._scan_locked
+        self._scan_lock = threading.Lock()
+
+    def _ttl(self) -> float:
+        from shona_core.settings import load_settings
+
+        return float(load_settings().get("live_cache_ttl", 2.0))
+
+    def ping(self, args: dict) -> dict:
+        return {"pid": os.getpid(), "uptime_s": round(time.time() - self.started, 1), "cwd": os.getcwd()}
+
+    def _scan_locked(self, sequential: bool) -> str:
+        from shona_core.scan import run_scan
+
+        with self._scan_lock:
+            return str(run_scan(concurrent=not sequential))
+
+    def scan(self, args: dict) -> dict:
+        return {"snapshot": self._scan(bool(args.get("sequential", False)))}
+
+    def diff(self, args: dict) -> dict:
+        from shona_core.diff import diff_against_baseline, diff_latest_two
+        from shona_core.risk import score_diff
+
+        d = diff_against_baseline() if args.get("baseline") else diff_latest_two()
+        return {"diff": d, "risk": score_diff(d)}
+
+    def ps(self, args: dict) -> list[dict]:
+        return self._ps.get(self._ttl())[0]
+
+    def ports(self, args: dict) -> list[dict]:
+        return self._ports.get(self._ttl())[0]
+
+
+def _make_server(handlers: _Handlers):
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            try:
+                req = json.loads(self.rfile.readline() or b"{}")
+                cmd = str(req.get("cmd", ""))
+                if cmd not in COMMANDS:
+                    res = {"ok": False, "message": f"unknown command: {cmd!r}"}
+                elif cmd == "shutdown":
+                    res = {"ok": True, "result": {"pid": os.getpid()}}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    res = {"ok": True, "result": getattr(handlers, cmd)(req.get("args") or {})}
+            except Exception as e:
+                res = {"ok": False, "message": str(e) or e.__class__.__name__}
+            self.wfile.write(json.dumps(res).encode("utf-8") + b"\n")
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    return Server(str(SOCKET_PATH), Handler)
+
+
+def _claim_socket() -> bool:
+    """
+    False if a live daemon already owns the socket; removes a stale one.
+    """
+    if SOCKET_PATH.exists():
+        if ping() is not None:
+            return False
+        SOCKET_PATH.unlink(missing_ok=True)
+    return True
+
+
+def serve(ready: threading.Event | None = None, **shared) -> dict:
+    """
+    Runs the control socket until a shutdown request (blocking). `shared` is
+    passed to _Handlers (ps_cache, ports_cache, scan).
+    """
+    if not supported():
+        return {"ok": False, "message": "control socket needs AF_UNIX (not available on this platform)"}
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if not _claim_socket():
+        return {"ok": False, "message": f"daemon already running on {SOCKET_PATH}"}
+
+    old_umask = os.umask(0o177)
+    try:
+        server = _make_server(_Handlers(**shared))
+    finally:
+        os.umask(old_umask)
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        SOCKET_PATH.unlink(missing_ok=True)
+    return {"ok": True, "message": "daemon stopped"}
+
+
+def serve_in_background(**shared) -> threading.Thread | None:
+    """
+    Serves the control socket from a thread of this process (the web server
+    does this at start-up, sharing its caches and scan jobs). None when
+    unsupported or another daemon is up.
+    """
+    if not supported() or ping() is not None:
+        return None
+    t = threading.Thread(target=serve, kwargs=shared, name="shona-control", daemon=True)
+    t.start()
+    return t
+
+
+if __name__ == "__main__":
+    print(json.dumps(serve()))
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+import hashlib
+import socket
 from pathlib import Path
-from shona_core.utils.io import list_files_sorted, read_json
-from shona_core.retention import baseline_get, apply_ignore_to_diff
+from shona_core import catalog
+from shona_core.settings import load_settings
+from shona_core.utils.cache import LRUCache
+from shona_core.utils.io import read_snapshot
+from shona_core.retention import baseline_get, apply_ignore_to_diff, ignore_version
 
 SNAP_DIR = Path(".shona/snapshots")
+DIFF_CACHE_DIR = Path(".shona/cache/diff")
+
+# (from_sha, to_sha) -> raw set diff; (from_sha, to_sha, ignore_version) -> filtered diff.
+# Editing the ignore list only misses the second stage. Cached values are shared:
+# treat returned diffs as read-only.
+_RAW_CACHE = LRUCache(maxsize=64)
+_FILTERED_CACHE = LRUCache(maxsize=64)
 
 
 def _process_set(snapshot: dict) -> set[str]:
@@ -17,30 +29,31 @@ def _ports_set(snapshot: dict) -> set[str]:
     return set(f"{p.get('proto')}:{p.get('local')}" for p in ports if p.get("proto") and p.get("local"))
 
 
+def _startup_key(it: dict) -> str | None:
+    src = it.get("source", "")
+    name = it.get("name", "")
+    val = it.get("value", "")
+    key = it.get("key", "")
+    if src == "registry_run":
+        return f"reg:{key}:{name}:{val}"
+    if src == "startup_folder":
+        return f"folder:{name}:{val}"
+    return None
+
+
 def _startup_set(snapshot: dict) -> set[str]:
     items = snapshot.get("startup", [])
-    s = set()
-    for it in items:
-        src = it.get("source", "")
-        name = it.get("name", "")
-        val = it.get("value", "")
-        key = it.get("key", "")
-        if src == "registry_run":
-            s.add(f"reg:{key}:{name}:{val}")
-        elif src == "startup_folder":
-            s.add(f"folder:{name}:{val}")
-    return s
+    return {k for k in (_startup_key(it) for it in items) if k}
+
+
+def _task_key(it: dict) -> str | None:
+    tn = it.get("TaskName")
+    return f"{tn}|{it.get('Task To Run')}" if tn else None
 
 
 def _tasks_set(snapshot: dict) -> set[str]:
     items = snapshot.get("scheduled_tasks", [])
-    s = set()
-    for it in items:
-        tn = it.get("TaskName")
-        run = it.get("Task To Run")
-        if tn:
-            s.add(f"{tn}|{run}")
-    return s
+    return {k for k in (_task_key(it) for it in items) if k}
 
 
 def _services_set(snapshot: dict) -> set[str]:
@@ -54,38 +67,203 @@ def _services_set(snapshot: dict) -> set[str]:
     return s
 
 
+def _process_hashes(snapshot: dict) -> dict[str, list[str]]:
+    out: dict[str, set[str]] = {}
+    for p in snapshot.get("processes", []):
+        if p.get("name") and p.get("exe_sha256"):
+            out.setdefault(p["name"], set()).add(p["exe_sha256"])
+    return {k: sorted(v) for k, v in out.items()}
+
+
+def _startup_hashes(snapshot: dict) -> dict[str, list[str]]:
+    return {k: [it["sha256"]] for it in snapshot.get("startup", []) if it.get("sha256") and (k := _startup_key(it))}
+
+
+def _tasks_hashes(snapshot: dict) -> dict[str, list[str]]:
+    return {k: [it["sha256"]] for it in snapshot.get("scheduled_tasks", []) if it.get("sha256") and (k := _task_key(it))}
+
+
+# diff key -> {item key: target sha256s}; same key, new hash = "modified"
+HASHED = {
+    "processes": _process_hashes,
+    "startup": _startup_hashes,
+    "scheduled_tasks": _tasks_hashes,
+}
+
+
+def _modified(a: dict[str, list[str]] | None, b: dict[str, list[str]] | None) -> list[dict]:
+    """
+    Items present on both sides whose target now has a hash it did not have
+    before (a binary replaced in place). Items unhashed on either side are skipped.
+    """
+    if not a or not b:
+        return []
+    out = []
+    for key in sorted(a.keys() & b.keys()):
+        if set(b[key]) - set(a[key]):
+            out.append({"key": key, "from": a[key], "to": b[key]})
+    return out
+
+
 def _diff_sets(a: set[str], b: set[str]) -> dict:
-    return {"added": sorted(b - a), "removed": sorted(a - b)}
+    return {"added": sorted(b - a), "removed": sorted(a - b), "modified": []}
 
 
-def _load_snapshot(path: Path) -> dict:
-    return read_json(path)
+# diff key -> (snapshot section, key-set builder)
+SURFACES = {
+    "processes": ("processes", _process_set),
+    "ports": ("listening_ports", _ports_set),
+    "startup": ("startup", _startup_set),
+    "scheduled_tasks": ("scheduled_tasks", _tasks_set),
+    "services": ("services", _services_set),
+}
 
 
-def diff_latest_two() -> dict:
-    snaps = list_files_sorted(SNAP_DIR, ".json")
+def _collected(snapshot: dict, section: str) -> bool:
+    """
+    False if the collector for this section timed out or failed during the scan.
+    Snapshots written before collector status existed count as collected.
+    """
+    meta = snapshot.get("collectors", {}).get(section) or {}
+    return meta.get("status", "ok") == "ok"
+
+
+def key_sets(snapshot: dict) -> dict[str, set[str] | None]:
+    """
+    {diff key: set of item keys}, None for surfaces whose collector failed.
+    """
+    return {
+        key: build(snapshot) if _collected(snapshot, section) else None
+        for key, (section, build) in SURFACES.items()
+    }
+
+
+def hash_maps(snapshot: dict) -> dict[str, dict | None]:
+    """
+    {diff key: {item key: target hashes}} for HASHED surfaces, None if the collector failed.
+    """
+    return {
+        key: build(snapshot) if _collected(snapshot, SURFACES[key][0]) else None
+        for key, build in HASHED.items()
+    }
+
+
+def diff_key_sets(
+    a: dict[str, set[str] | None],
+    b: dict[str, set[str] | None],
+    a_hashes: dict | None = None,
+    b_hashes: dict | None = None,
+) -> dict:
+    """
+    Raw (unfiltered) diff between two key_sets() results, plus "modified"
+    items when both hash_maps() results are given.
+    """
+    diff: dict = {"ok": True}
+    unknown: list[str] = []
+    for key in SURFACES:
+        if a.get(key) is None or b.get(key) is None:
+            diff[key] = {"added": [], "removed": [], "modified": [], "status": "unknown"}
+            unknown.append(key)
+        else:
+            diff[key] = _diff_sets(a[key], b[key])
+            if key in HASHED and a_hashes and b_hashes:
+                diff[key]["modified"] = _modified(a_hashes.get(key), b_hashes.get(key))
+    diff["unknown"] = unknown
+    return diff
+
+
+def _load_snapshot(path: Path, sections: list[str], loaded: dict | None = None) -> dict:
+    """
+    Loads just `sections` (header only if empty). Legacy .json comes back whole,
+    so a previously loaded document is reused when it already has them.
+    """
+    if loaded is not None and all(s in loaded for s in sections):
+        return loaded
+    return read_snapshot(path, sections=sections)
+
+
+def diff_latest_two(host: str | None = None) -> dict:
+    snaps = catalog.latest(host or socket.gethostname(), 2)
     if len(snaps) < 2:
         return {"ok": False, "message": "Need at least 2 snapshots. Run `shona scan` twice.", "snapshots_found": len(snaps)}
 
-    a_path, b_path = snaps[-2], snaps[-1]
+    a_path, b_path = Path(snaps[0]["path"]), Path(snaps[1]["path"])
     return diff_between(a_path, b_path)
 
 
+def _content_hash(path: Path) -> str:
+    """
+    The catalog's sha256 while the file is unchanged since it was indexed;
+    a snapshot replaced at the same path is hashed again.
+    """
+    row = catalog.get(path)
+    if catalog.hash_is_current(row, path):
+        return row["sha256"]
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
 def diff_between(a_path: Path, b_path: Path) -> dict:
-    a = _load_snapshot(a_path)
-    b = _load_snapshot(b_path)
+    """
+    Memoized on snapshot content hashes; settings diff_cache_disk=true also
+    keeps raw diffs under .shona/cache/diff across restarts.
+    """
+    a_hash, b_hash = _content_hash(a_path), _content_hash(b_path)
+
+    raw = _RAW_CACHE.get((a_hash, b_hash))
+    if raw is None:
+        _RAW_CACHE.disk_dir = DIFF_CACHE_DIR if load_settings().get("diff_cache_disk", False) else None
+        raw = _RAW_CACHE.get((a_hash, b_hash))
+        if raw is None:
+            raw = _raw_diff(a_path, b_path)
+            _RAW_CACHE.put((a_hash, b_hash), raw)
+
+    key = (a_hash, b_hash, ignore_version())
+    filtered = _FILTERED_CACHE.get(key)
+    if filtered is None:
+        filtered = apply_ignore_to_diff(raw)
+        _FILTERED_CACHE.put(key, filtered)
 
-    diff = {
+    return {**filtered, "from": a_path.name, "to": b_path.name}
+
+
+def _raw_diff(a_path: Path, b_path: Path) -> dict:
+    a = _load_snapshot(a_path, [])
+    b = _load_snapshot(b_path, [])
+    # dedup manifests (.snapm) carry per-section content hashes
+    a_hashes = a.get("section_hashes") or {}
+    b_hashes = b.get("section_hashes") or {}
+
+    diff: dict = {
         "ok": True,
         "from": a_path.name,
         "to": b_path.name,
-        "processes": _diff_sets(_process_set(a), _process_set(b)),
-        "ports": _diff_sets(_ports_set(a), _ports_set(b)),
-        "startup": _diff_sets(_startup_set(a), _startup_set(b)),
-        "scheduled_tasks": _diff_sets(_tasks_set(a), _tasks_set(b)),
-        "services": _diff_sets(_services_set(a), _services_set(b)),
     }
-    return apply_ignore_to_diff(diff)
+    unknown: list[str] = []
+    pending: list[str] = []
+    for key, (section, _) in SURFACES.items():
+        if not (_collected(a, section) and _collected(b, section)):
+            # an empty section from a failed collector is not "everything removed"
+            diff[key] = {"added": [], "removed": [], "modified": [], "status": "unknown"}
+            unknown.append(key)
+        elif a_hashes.get(section) and a_hashes.get(section) == b_hashes.get(section):
+            # identical content: nothing to load or compare
+            diff[key] = {"added": [], "removed": [], "modified": []}
+        else:
+            pending.append(key)
+
+    if pending:
+        sections = [SURFACES[k][0] for k in pending]
+        a = _load_snapshot(a_path, sections, a)
+        b = _load_snapshot(b_path, sections, b)
+        for key in pending:
+            build = SURFACES[key][1]
+            diff[key] = _diff_sets(build(a), build(b))
+            if key in HASHED:
+                diff[key]["modified"] = _modified(HASHED[key](a), HASHED[key](b))
+
+    diff = {k: diff[k] for k in ["ok", "from", "to", *SURFACES]}
+    diff["unknown"] = unknown
+    return diff
 
 
 def diff_against_baseline() -> dict:
@@ -97,9 +275,12 @@ def diff_against_baseline() -> dict:
     if not base_path.exists():
         return {"ok": False, "message": f"Baseline snapshot missing: {base_path}"}
 
-    snaps = list_files_sorted(SNAP_DIR, ".json")
+    # compare against the newest snapshot from the same host as the baseline
+    base_row = catalog.get(base_path)
+    host = base_row["host"] if base_row else socket.gethostname()
+    snaps = catalog.latest(host, 1)
     if not snaps:
         return {"ok": False, "message": "No snapshots found. Run: shona scan"}
 
-    latest = snaps[-1]
+    latest = Path(snaps[0]["path"])
     return diff_between(base_path, latest)
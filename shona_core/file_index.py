@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+from shona_core.find import dedupe_roots, prune_matcher
+
+RUNTIME_DIR = Path(".shona")
+INDEX_FILE = RUNTIME_DIR / "files.sqlite3"
+
+# a background refresh is started at most this often by search()
+REFRESH_SECONDS = 300
+
+# rows written per transaction while walking, so searches see a first build fill in
+BATCH_DIRS = 500
+
+_SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    parent INTEGER,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    dir INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# trigram index over file names (SQLite >= 3.34): a quoted phrase MATCH is a substring search
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(name, content='files', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO names (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO names (names, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+_REFRESH_LOCK = threading.Lock()
+_last_refresh_started = 0.0
+
+
+def default_roots() -> list[Path]:
+    home = Path.home()
+    return [home / "Desktop", home / "Downloads", home / "Documents", home]
+
+
+def _connect() -> sqlite3.Connection:
+    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(INDEX_FILE), timeout=30)
+    con.executescript(_SCHEMA)
+    try:
+        con.executescript(_FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        # no fts5/trigram in this SQLite build: searches fall back to a table scan
+        pass
+    return con
+
+
+def _list_dir(path: str, pruned: Callable[[str, str], bool]) -> tuple[list[str], list[str]]:
+    files: list[str] = []
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if not pruned(e.name, e.path):
+                            subdirs.append(e.path)
+                    elif e.is_file():
+                        files.append(e.name)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def refresh(roots: list[Path] | None = None) -> dict:
+    """
+    Brings the index up to date. Only directories whose mtime changed since the
+    last refresh are re-listed; unchanged ones are just stat'ed, and their
+    subdirectories come from the index. Directories matching the find prune
+    rules are left out.
+    """
+    roots = dedupe_roots(roots or default_roots())
+    pruned = prune_matcher()
+    t0 = time.perf_counter()
+    listed = 0
+    stat_only = 0
+
+    with closing(_connect()) as con:
+        known: dict[str, tuple[int, int]] = {}
+        children: dict[int, list[str]] = {}
+        for did, path, parent, mtime in con.execute("SELECT id, path, parent, mtime_ns FROM dirs"):
+            known[path] = (did, mtime)
+            if parent is not None:
+                children.setdefault(parent, []).append(path)
+
+        seen: set[str] = set()
+        stack: list[tuple[str, int | None]] = [(str(r), None) for r in roots]
+        pending = 0
+        while stack:
+            path, parent = stack.pop()
+            if path in seen:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(path)
+            row = known.get(path)
+
+            if row is not None and row[1] == mtime:
+                stat_only += 1
+                stack.extend((c, row[0]) for c in children.get(row[0], []))
+                continue
+
+            files, subdirs = _list_dir(path, pruned)
+            listed += 1
+            if row is None:
+                did = con.execute(
+                    "INSERT INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)", (path, parent, mtime)
+                ).lastrowid
+            else:
+                did = row[0]
+                con.execute("UPDATE dirs SET parent = ?, mtime_ns = ? WHERE id = ?", (parent, mtime, did))
+                con.execute("DELETE FROM files WHERE dir = ?", (did,))
+            con.executemany("INSERT INTO files (dir, name) VALUES (?, ?)", ((did, n) for n in files))
+            stack.extend((s, did) for s in subdirs)
+
+            pending += 1
+            if pending >= BATCH_DIRS:
+                con.commit()
+                pending = 0
+
+        gone = [known[p][0] for p in known.keys() - seen]
+        for i in range(0, len(gone), 500):
+            chunk = gone[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            con.execute(f"DELETE FROM files WHERE dir IN ({marks})", chunk)
+            con.execute(f"DELETE FROM dirs WHERE id IN ({marks})", chunk)
+        con.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('refreshed', ?), ('roots', ?)",
+            (str(int(time.time())), os.pathsep.join(str(r) for r in roots)),
+        )
+        con.commit()
+        total = con.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    return {
+        "ok": True,
+        "files": total,
+        "dirs_listed": listed,
+        "dirs_unchanged": stat_only,
+        "dirs_removed": len(gone),
+        "ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+
+def _refresh_worker(roots: list[Path] | None) -> None:
+    try:
+        refresh(roots)
+    except Exception:
+        pass
+    finally:
+        _REFRESH_LOCK.release()
+
+
+def refresh_in_background(roots: list[Path] | None = None, min_interval: float = REFRESH_SECONDS) -> bool:
+    """
+    Starts a refresh thread unless one is running or one started within min_interval.
+    """
+    global _last_refresh_started
+    if time.monotonic() - _last_refresh_started < min_interval and _last_refresh_started:
+        return False
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        return False
+    _last_refresh_started = time.monotonic()
+    threading.Thread(target=_refresh_worker, args=(roots,), name="shona-file-index", daemon=True).start()
+    return True
+
+
+def is_refreshing() -> bool:
+    return _REFRESH_LOCK.locked()
+
+
+def _like_escape(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search(query: str, limit: int = 30, prefer: list[Path] | None = None) -> list[str]:
+    """
+    Case-insensitive substring match on file names. Hits under `prefer`
+    directories (in order) come first. Kicks off a background refresh when
+    the index is stale; results reflect the index as it is now.
+    """
+    q = query.strip()
+    if not q:
+        return []
+    refresh_in_background()
+
+    with closing(_connect()) as con:
+        fts = con.execute("SELECT 1 FROM sqlite_master WHERE name = 'names'").fetchone() is not None
+        # over-fetch so preferred directories can be ranked first
+        cap = max(limit * 20, 500)
+        if fts and len(q) >= 3:
+            rows = con.execute(
+                "SELECT d.path, f.name FROM names JOIN files f ON f.id = names.rowid "
+                "JOIN dirs d ON d.id = f.dir WHERE names MATCH ? LIMIT ?",
+                ('"' + q.replace('"', '""') + '"', cap),
+            ).fetchall()
+        else:
+            # trigrams need 3 characters; shorter queries scan the names
+            rows = con.execute(
+                "SELECT d.path, f.name FROM files f JOIN dirs d ON d.id = f.dir WHERE f.name LIKE ? ESCAPE '\\' LIMIT ?",
+                (f"%{_like_escape(q)}%", cap),
+            ).fetchall()
+
+    prefer = [str(p) for p in (prefer or default_roots()[:-1])]
+
+    def rank(row: tuple[str, str]) -> int:
+        for i, base in enumerate(prefer):
+            if row[0] == base or row[0].startswith(base + os.sep):
+                return i
+        return len(prefer)
+
+    rows.sort(key=rank)
+    return [os.path.join(d, n) for d, n in rows[:limit]]
+
+
+def status() -> dict:
+    with closing(_connect()) as con:
+        meta = dict(con.execute("SELECT key, value FROM meta").fetchall())
+        files = con.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        dirs = con.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+    return {
+        "ok": True,
+        "files": files,
+        "dirs": dirs,
+        "refreshed": int(meta.get("refreshed", 0)),
+        "refreshing": is_refreshing(),
+    }
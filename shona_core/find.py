@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+from shona_core.settings import load_settings
+
+# directories never descended into (settings: find_prune, comma-separated or a
+# list, replaces these). Plain entries are globs over the directory name;
+# entries with a "/" are globs over the full path (separators normalised).
+DEFAULT_PRUNE = [
+    ".git", ".hg", ".svn",
+    "node_modules", "__pycache__", ".venv", "venv", ".tox",
+    ".cache", ".npm", ".gradle", ".m2", ".cargo", ".rustup",
+    ".mypy_cache", ".pytest_cache", "site-packages",
+    "$Recycle.Bin", "System Volume Information",
+    "*/AppData/Local/Temp", "*/AppData/Local/Packages", "*/Library/Caches",
+]
+
+DEFAULT_WORKERS = 8
+DEFAULT_BUDGET = 10.0
+
+_DONE = object()
+
+
+def dedupe_roots(roots: list[Path]) -> list[Path]:
+    """
+    Drops roots nested inside another root: each directory is walked once.
+    """
+    resolved = []
+    for r in roots:
+        try:
+            resolved.append(r.resolve())
+        except OSError:
+            continue
+    out: list[Path] = []
+    for r in sorted(set(resolved), key=lambda p: len(p.parts)):
+        if not any(r == o or o in r.parents for o in out):
+            out.append(r)
+    return out
+
+
+def prune_rules() -> list[str]:
+    raw = load_settings().get("find_prune")
+    if raw is None:
+        return list(DEFAULT_PRUNE)
+    if isinstance(raw, str):
+        return [r.strip() for r in raw.split(",") if r.strip()]
+    return [str(r) for r in raw]
+
+
+def prune_matcher(rules: list[str] | None = None) -> Callable[[str, str], bool]:
+    """
+    Compiles prune rules into one test: pruned(name, path) -> bool.
+    """
+    rules = prune_rules() if rules is None else rules
+    names = [r for r in rules if "/" not in r and "\\" not in r]
+    paths = [r.replace("\\", "/") for r in rules if r not in names]
+    name_re = re.compile("|".join(f"(?:{fnmatch.translate(n)})" for n in names), re.IGNORECASE) if names else None
+    path_re = re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in paths), re.IGNORECASE) if paths else None
+
+    def pruned(name: str, path: str) -> bool:
+        if name_re is not None and name_re.match(name):
+            return True
+        if path_re is not None and path_re.match(path.replace("\\", "/")):
+            return True
+        return False
+
+    return pruned
+
+
+def find_files(
+    query: str,
+    roots: list[Path],
+    limit: int = 200,
+    budget_s: float = DEFAULT_BUDGET,
+    workers: int = DEFAULT_WORKERS,
+    prune: list[str] | None = None,
+    stats: dict | None = None,
+) -> Iterator[str]:
+    """
+    Parallel os.scandir walk yielding paths whose name contains `query`
+    (case-insensitive) as soon as they are found. Pruned directories are not
+    entered, symlinked directories are not followed and files are never
+    stat'ed. Stops at `limit` hits or after `budget_s` seconds; `stats`, if
+    given, is filled with dirs, hits, timed_out and ms when iteration ends.
+    """
+    q = query.lower().strip()
+    stats = stats if stats is not None else {}
+    stats.update({"dirs": 0, "hits": 0, "timed_out": False, "ms": 0.0})
+    if not q or not roots:
+        return
+
+    pruned = prune_matcher(prune)
+    t0 = time.perf_counter()
+    deadline = time.monotonic() + budget_s
+    dirs: queue.Queue[str] = queue.Queue()
+    out: queue.Queue = queue.Queue(maxsize=1024)
+    stop = threading.Event()
+    lock = threading.Lock()
+    pending = [0]
+
+    def emit(item) -> None:
+        # bounded output: a slow consumer throttles the walk instead of buffering it
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def scan(path: str) -> None:
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    if stop.is_set():
+                        return
+                    try:
+                        is_dir = e.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if not pruned(e.name, e.path):
+                            subdirs.append(e.path)
+                    elif q in e.name.lower():
+                        emit(e.path)
+        except OSError:
+            return
+        finally:
+            with lock:
+                pending[0] += len(subdirs)
+            for s in subdirs:
+                dirs.put(s)
+
+    def worker() -> None:
+        while not stop.is_set():
+            try:
+                path = dirs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                scan(path)
+            finally:
+                with lock:
+                    pending[0] -= 1
+                    stats["dirs"] += 1
+                    finished = pending[0] == 0
+                if finished:
+                    emit(_DONE)
+                    return
+
+    for r in dedupe_roots(roots):
+        if r.is_dir():
+            pending[0] += 1
+            dirs.put(str(r))
+    if not pending[0]:
+        return
+
+    threads = [threading.Thread(target=worker, name=f"shona-find-{i}", daemon=True) for i in range(max(1, workers))]
+    for t in threads:
+        t.start()
+
+    try:
+        while stats["hits"] < limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                stats["timed_out"] = True
+                break
+            try:
+                item = out.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                break
+            stats["hits"] += 1
+            yield item
+    finally:
+        stop.set()
+        stats["ms"] = round((time.perf_counter() - t0) * 1000, 2)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import fnmatch
+import ipaddress
+import re
+from dataclasses import dataclass, field
+
+# ignore.json kind -> diff surface it filters ("paths" applies to startup + tasks)
+SURFACE_KINDS = ["processes", "ports", "startup", "scheduled_tasks", "services"]
+IGNORE_KINDS = SURFACE_KINDS + ["paths"]
+
+# Rule syntax (one string per entry):
+#   OneDrive.exe            exact item key
+#   glob:kworker/*          shell-style glob over the whole key
+#   re:^svchost             regular expression (re.search)
+#   cidr:127.0.0.0/8        ports only: local address inside the network
+#   port:8000-9000          ports only: local port (or range); "port:udp:53" limits proto
+# "paths" entries match the command/path of startup entries and scheduled tasks:
+#   plain entries are case-insensitive path prefixes, glob:/re: match the whole path.
+
+
+@dataclass
+class _Rules:
+    exact: set[str] = field(default_factory=set)
+    globs: list[str] = field(default_factory=list)
+    regexes: list[str] = field(default_factory=list)
+    nets: list = field(default_factory=list)
+    port_ranges: list[tuple[str | None, int, int]] = field(default_factory=list)
+    prefixes: list[str] = field(default_factory=list)
+    glob_re: re.Pattern | None = None
+    search_res: list[re.Pattern] = field(default_factory=list)
+
+    def empty(self) -> bool:
+        return not (self.exact or self.glob_re or self.search_res or self.nets or self.port_ranges or self.prefixes)
+
+    def finish(self, casefold: bool = False) -> None:
+        flags = re.IGNORECASE if casefold else 0
+        # one alternation per rule type: cost grows with key length, not rule count
+        if self.globs:
+            self.glob_re = re.compile("|".join(f"(?:{fnmatch.translate(g)})" for g in self.globs), flags)
+        if self.regexes:
+            try:
+                self.search_res = [re.compile("|".join(f"(?:{r})" for r in self.regexes), flags)]
+            except re.error:
+                # each rule compiles alone but not joined: global inline flags
+                # ("(?i)...") or a group name reused across rules
+                self.search_res = [re.compile(r, flags) for r in self.regexes]
+        if self.prefixes:
+            self.prefixes = sorted({p.lower() for p in self.prefixes})
+
+
+def _split_port_key(key: str) -> tuple[str, str, int] | None:
+    """
+    "TCP:0.0.0.0:22" / "UDP:[::]:53" / "UDP:127.0.0.53%lo:53" -> (proto, ip, port)
+    """
+    proto, _, rest = key.partition(":")
+    addr, _, port = rest.rpartition(":")
+    addr = addr.strip("[]").split("%", 1)[0]
+    if not port.isdigit():
+        return None
+    return proto.upper(), addr, int(port)
+
+
+def _task_path(key: str) -> str:
+    # "<TaskName>|<Task To Run>"
+    return key.split("|", 1)[1] if "|" in key else ""
+
+
+def _startup_path(key: str) -> str:
+    # "reg:<key>:<name>:<value>" / "folder:<name>:<value>"; values may hold ':' (C:\)
+    if key.startswith("reg:"):
+        parts = key.split(":", 3)
+        return parts[3] if len(parts) > 3 else ""
+    if key.startswith("folder:"):
+        parts = key.split(":", 2)
+        return parts[2] if len(parts) > 2 else ""
+    return ""
+
+
+def _norm_path(p: str) -> str:
+    return p.strip().lstrip('"').lower()
+
+
+class IgnoreMatcher:
+    """
+    ignore.json compiled once per version. match(kind, key) answers whether a
+    diff item should be hidden.
+    """
+
+    def __init__(self, data: dict) -> None:
+        self.errors: list[str] = []
+        self.rules: dict[str, _Rules] = {}
+        for kind in IGNORE_KINDS:
+            rules = _Rules()
+            for raw in data.get(kind, []) or []:
+                self._add(kind, rules, str(raw))
+            rules.finish(casefold=(kind == "paths"))
+            self.rules[kind] = rules
+
+    def _add(self, kind: str, rules: _Rules, raw: str) -> None:
+        try:
+            if raw.startswith("glob:"):
+                rules.globs.append(raw[5:])
+            elif raw.startswith("re:"):
+                re.compile(raw[3:])
+                rules.regexes.append(raw[3:])
+            elif kind == "ports" and raw.startswith("cidr:"):
+                rules.nets.append(ipaddress.ip_network(raw[5:], strict=False))
+            elif kind == "ports" and raw.startswith("port:"):
+                spec = raw[5:]
+                proto = None
+                if ":" in spec:
+                    proto, spec = spec.split(":", 1)
+                    proto = proto.upper()
+                lo, _, hi = spec.partition("-")
+                rules.port_ranges.append((proto, int(lo), int(hi or lo)))
+            elif kind == "paths":
+                rules.prefixes.append(raw.strip().lstrip('"'))
+            else:
+                rules.exact.add(raw)
+        except (re.error, ValueError) as e:
+            self.errors.append(f"{kind}: {raw!r}: {e}")
+
+    def active(self, kind: str) -> bool:
+        if kind in ("startup", "scheduled_tasks") and not self.rules["paths"].empty():
+            return True
+        return not self.rules[kind].empty()
+
+    def _match_rules(self, rules: _Rules, key: str) -> bool:
+        if key in rules.exact:
+            return True
+        if rules.glob_re is not None and rules.glob_re.match(key):
+            return True
+        if any(r.search(key) for r in rules.search_res):
+            return True
+        return False
+
+    def _match_path(self, path: str) -> bool:
+        rules = self.rules["paths"]
+        if not path or rules.empty():
+            return False
+        p = _norm_path(path)
+        if any(p.startswith(pre) for pre in rules.prefixes):
+            return True
+        return self._match_rules(rules, p)
+
+    def match(self, kind: str, key: str) -> bool:
+        rules = self.rules[kind]
+        if self._match_rules(rules, key):
+            return True
+        if kind == "ports" and (rules.nets or rules.port_ranges):
+            parts = _split_port_key(key)
+            if parts:
+                proto, addr, port = parts
+                for p, lo, hi in rules.port_ranges:
+                    if lo <= port <= hi and (p is None or p == proto):
+                        return True
+                if rules.nets:
+                    try:
+                        ip = ipaddress.ip_address(addr)
+                    except ValueError:
+                        ip = None
+                    if ip is not None and any(ip.version == n.version and ip in n for n in rules.nets):
+                        return True
+        if kind == "startup":
+            return self._match_path(_startup_path(key))
+        if kind == "scheduled_tasks":
+            return self._match_path(_task_path(key))
+        return False
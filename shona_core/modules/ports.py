@@ -1,8 +1,239 @@
 from __future__ import annotations
 
+import os
 import platform
-import subprocess
+import socket
 import re
+import struct
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from shona_core.utils.proc import check_output
+
+PROC_DIR = Path("/proc")
+
+# /proc/net/<file> -> (proto label, address family, socket states that count as listening)
+# TCP 0A = LISTEN; UDP 07 = unconnected (what `ss -lu` reports as UNCONN)
+_PROC_NET_TABLES = [
+    ("tcp", "TCP", socket.AF_INET, b"0A"),
+    ("tcp6", "TCP", socket.AF_INET6, b"0A"),
+    ("udp", "UDP", socket.AF_INET, b"07"),
+    ("udp6", "UDP", socket.AF_INET6, b"07"),
+]
+_IPPROTO = {"TCP": socket.IPPROTO_TCP, "UDP": socket.IPPROTO_UDP}
+
+# sock_diag netlink, the interface ss itself reads. Unlike /proc/net it reports
+# IPV6_V6ONLY and the bound device, both of which show up in ss's "local"
+# strings (and so in diff keys): "*:22" for a dual-stack wildcard socket,
+# "127.0.0.53%lo:53" for one bound to a device.
+_NETLINK_SOCK_DIAG = 4
+_SOCK_DIAG_BY_FAMILY = 20
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_NLM_F_REQUEST_DUMP = 0x301
+_INET_DIAG_SKV6ONLY = 11
+_NLMSG_HDR = struct.Struct("=IHHII")
+_DIAG_REQ = struct.Struct("=BBBBI48x")
+# inet_diag_msg: family, state, timer, retrans, sport(be), dport(be), src[16],
+# dst[16], ifindex, cookie[8], expires, rqueue, wqueue, uid, inode
+_DIAG_MSG = struct.Struct("=BBBB2s2s16s16sI8xIIIII")
+
+
+@lru_cache(maxsize=1024)
+def _decode_addr(hex_addr: bytes, family: int) -> str:
+    """
+    /proc/net addresses are hex dumps of 32-bit words in host byte order.
+    Cached: most sockets bind one of a handful of local addresses.
+    """
+    raw = bytes.fromhex(hex_addr.decode("ascii"))
+    if sys.byteorder == "little":
+        raw = b"".join(raw[i : i + 4][::-1] for i in range(0, len(raw), 4))
+    return socket.inet_ntop(family, raw)
+
+
+def _format_local(ip: str, port: int, family: int, v6only: bool = True, ifindex: int = 0) -> str:
+    """
+    "IP:PORT" exactly as `ss -n` prints it.
+    """
+    if family == socket.AF_INET6:
+        host = "*" if ip == "::" and not v6only else f"[{ip}]"
+    else:
+        host = ip
+    if ifindex:
+        try:
+            host = f"{host}%{socket.if_indextoname(ifindex)}"
+        except OSError:
+            host = f"{host}%if{ifindex}"
+    return f"{host}:{port}"
+
+
+def _sock_diag(proto: int, family: int, states: bytes) -> list[tuple[str, int]]:
+    """
+    Returns [(local "IP:PORT", inode)] for sockets in a listening state, via
+    sock_diag. Raises OSError when the kernel refuses the dump.
+    """
+    mask = 1 << int(states, 16)
+    req = _DIAG_REQ.pack(family, proto, 0, 0, mask)
+    addr_len = 4 if family == socket.AF_INET else 16
+    rows: list[tuple[str, int]] = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_SOCK_DIAG) as nl:
+        nl.sendto(_NLMSG_HDR.pack(_NLMSG_HDR.size + len(req), _SOCK_DIAG_BY_FAMILY, _NLM_F_REQUEST_DUMP, 1, 0) + req, (0, 0))
+        while True:
+            data = nl.recv(1 << 16)
+            off = 0
+            while off + _NLMSG_HDR.size <= len(data):
+                length, kind = _NLMSG_HDR.unpack_from(data, off)[:2]
+                if kind == _NLMSG_DONE:
+                    return rows
+                if kind == _NLMSG_ERROR:
+                    errno = -struct.unpack_from("=i", data, off + _NLMSG_HDR.size)[0]
+                    raise OSError(errno, f"sock_diag: {os.strerror(errno)}")
+                body = off + _NLMSG_HDR.size
+                _, _, _, _, sport, _, src, _, ifindex, _, _, _, _, inode = _DIAG_MSG.unpack_from(data, body)
+                v6only = False
+                attr = body + _DIAG_MSG.size
+                while attr + 4 <= off + length:
+                    a_len, a_type = struct.unpack_from("=HH", data, attr)
+                    if a_len < 4:
+                        break
+                    if a_type == _INET_DIAG_SKV6ONLY:
+                        v6only = bool(data[attr + 4])
+                    attr += (a_len + 3) & ~3
+                ip = socket.inet_ntop(family, src[:addr_len])
+                port = int.from_bytes(sport, "big")
+                rows.append((_format_local(ip, port, family, v6only, ifindex), inode))
+                off += (length + 3) & ~3
+            if not data:
+                return rows
+
+
+def _bindv6only() -> bool:
+    try:
+        return (PROC_DIR / "sys/net/ipv6/bindv6only").read_text().strip() == "1"
+    except OSError:
+        return False
+
+
+def _proc_net_rows(name: str, family: int, states: bytes) -> list[tuple[str, int, int]]:
+    """
+    Returns [(ip, port, inode)] for sockets in a listening state.
+    """
+    path = PROC_DIR / "net" / name
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return []
+
+    rows: list[tuple[str, int, int]] = []
+    for line in data.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) < 10 or parts[3] != states:
+            continue
+        addr_hex, _, port_hex = parts[1].partition(b":")
+        try:
+            ip = _decode_addr(addr_hex, family)
+            port = int(port_hex, 16)
+            inode = int(parts[9])
+        except ValueError:
+            continue
+        rows.append((ip, port, inode))
+    return rows
+
+
+def _read_proc_net(name: str, family: int, states: bytes) -> list[tuple[str, int]]:
+    """
+    Returns [(local "IP:PORT", inode)] for sockets in a listening state.
+    /proc/net has neither the V6ONLY flag nor the bound device: a "::" socket
+    is taken as V6ONLY when an IPv4 wildcard holds the same port (a dual-stack
+    one could not coexist with it), otherwise per net.ipv6.bindv6only; device
+    scopes are lost. Only used when sock_diag is unavailable.
+    """
+    rows = _proc_net_rows(name, family, states)
+    if family != socket.AF_INET6:
+        return [(_format_local(ip, port, family), inode) for ip, port, inode in rows]
+
+    v4_wildcard: set[int] = set()
+    if any(ip == "::" for ip, _, _ in rows):
+        v4_wildcard = {port for ip, port, _ in _proc_net_rows(name[:-1], socket.AF_INET, states) if ip == "0.0.0.0"}
+    default = _bindv6only()
+    return [(_format_local(ip, port, family, port in v4_wildcard or default), inode) for ip, port, inode in rows]
+
+
+def _socket_inode_pids(wanted: set[int]) -> dict[int, int]:
+    """
+    Single pass over /proc/*/fd mapping socket inodes -> pid.
+    Only inodes in `wanted` are kept; stops early once all are resolved.
+    Other users' fd dirs are unreadable without privileges and are skipped.
+    """
+    found: dict[int, int] = {}
+    if not wanted:
+        return found
+
+    with os.scandir(PROC_DIR) as it:
+        for entry in it:
+            if not entry.name.isdigit():
+                continue
+            fd_dir = f"{PROC_DIR}/{entry.name}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+            for fd in fds:
+                try:
+                    target = os.readlink(f"{fd_dir}/{fd}")
+                except OSError:
+                    continue
+                if not target.startswith("socket:["):
+                    continue
+                inode = int(target[8:-1])
+                if inode in wanted and inode not in found:
+                    found[inode] = int(entry.name)
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+def _list_listening_ports_procfs(use_diag: bool = True) -> list[dict]:
+    """
+    Native Linux reader: sock_diag, or /proc/net/{tcp,tcp6,udp,udp6} where
+    netlink is refused (some sandboxes) or use_diag is False.
+    """
+    rows: list[tuple[str, str, int]] = []
+    for name, proto, family, states in _PROC_NET_TABLES:
+        try:
+            if not use_diag:
+                raise OSError("sock_diag disabled")
+            found = _sock_diag(_IPPROTO[proto], family, states)
+        except OSError:
+            found = _read_proc_net(name, family, states)
+        for local, inode in found:
+            rows.append((proto, local, inode))
+
+    pids = _socket_inode_pids({inode for _, _, inode in rows if inode})
+    return [{"proto": proto, "local": local, "pid": pids.get(inode)} for proto, local, inode in rows]
+
+
+def _list_listening_ports_ss() -> list[dict]:
+    try:
+        cmd = ["ss", "-lntu", "-p"]
+        out = check_output(cmd, text=True, errors="ignore")
+        results: list[dict] = []
+        for line in out.splitlines():
+            if line.startswith("Netid") or not line.strip():
+                continue
+            parts = re.split(r"\s+", line.strip())
+            proto = parts[0].upper()
+            local = parts[4] if len(parts) > 4 else ""
+            pid = None
+            m = re.search(r"pid=(\d+)", line)
+            if m:
+                pid = int(m.group(1))
+            if local:
+                results.append({"proto": proto, "local": local, "pid": pid})
+        return results
+    except Exception:
+        return []
 
 
 def list_listening_ports() -> list[dict]:
@@ -14,7 +245,7 @@ def list_listening_ports() -> list[dict]:
 
     if system == "windows":
         cmd = ["netstat", "-ano"]
-        out = subprocess.check_output(cmd, text=True, errors="ignore")
+        out = check_output(cmd, text=True, errors="ignore")
         results: list[dict] = []
         for line in out.splitlines():
             line = line.strip()
@@ -44,24 +275,10 @@ def list_listening_ports() -> list[dict]:
         results.sort(key=lambda x: (x["proto"], x["local"], x["pid"] or -1))
         return results
 
-    # Linux/macOS: try ss
-    try:
-        cmd = ["ss", "-lntu", "-p"]
-        out = subprocess.check_output(cmd, text=True, errors="ignore")
-        results: list[dict] = []
-        for line in out.splitlines():
-            if line.startswith("Netid") or not line.strip():
-                continue
-            parts = re.split(r"\s+", line.strip())
-            proto = parts[0].upper()
-            local = parts[4] if len(parts) > 4 else ""
-            pid = None
-            m = re.search(r"pid=(\d+)", line)
-            if m:
-                pid = int(m.group(1))
-            if local:
-                results.append({"proto": proto, "local": local, "pid": pid})
-        results.sort(key=lambda x: (x["proto"], x["local"], x["pid"] or -1))
-        return results
-    except Exception:
-        return []
+    if system == "linux" and (PROC_DIR / "net" / "tcp").exists():
+        results = _list_listening_ports_procfs()
+    else:
+        # macOS/other: try ss
+        results = _list_listening_ports_ss()
+    results.sort(key=lambda x: (x["proto"], x["local"], x["pid"] or -1))
+    return results
@@ -1,37 +1,35 @@
 from __future__ import annotations
 
+import os
 import platform
-import subprocess
+from pathlib import Path
 
+from shona_core.utils.proc import check_output
 
-def list_processes() -> list[dict]:
-    """
-    Returns a lightweight process list: [{"pid": int, "name": str}]
-    Windows: tasklist CSV
-    Linux/macOS: ps
-    """
-    system = platform.system().lower()
+PROC_DIR = Path("/proc")
 
-    if system == "windows":
-        cmd = ["tasklist", "/fo", "csv", "/nh"]
-        out = subprocess.check_output(cmd, text=True, errors="ignore")
-        procs: list[dict] = []
-        for line in out.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            parts = [p.strip().strip('"') for p in line.split('","')]
-            if len(parts) < 2:
-                continue
-            name = parts[0]
-            pid_str = parts[1]
-            if pid_str.isdigit():
-                procs.append({"pid": int(pid_str), "name": name})
-        procs.sort(key=lambda x: (x["name"].lower(), x["pid"]))
-        return procs
 
+def _list_processes_windows() -> list[dict]:
+    cmd = ["tasklist", "/fo", "csv", "/nh"]
+    out = check_output(cmd, text=True, errors="ignore")
+    procs: list[dict] = []
+    for line in out.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        parts = [p.strip().strip('"') for p in line.split('","')]
+        if len(parts) < 2:
+            continue
+        name = parts[0]
+        pid_str = parts[1]
+        if pid_str.isdigit():
+            procs.append({"pid": int(pid_str), "name": name})
+    return procs
+
+
+def _list_processes_ps() -> list[dict]:
     cmd = ["ps", "-eo", "pid,comm"]
-    out = subprocess.check_output(cmd, text=True, errors="ignore")
+    out = check_output(cmd, text=True, errors="ignore")
     procs: list[dict] = []
     for i, line in enumerate(out.splitlines()):
         if i == 0:
@@ -44,5 +42,115 @@ def list_processes() -> list[dict]:
             continue
         name = " ".join(name_parts) if name_parts else "unknown"
         procs.append({"pid": int(pid_str), "name": name})
+    return procs
+
+
+def _boot_time() -> int:
+    with (PROC_DIR / "stat").open("rb") as f:
+        for line in f:
+            if line.startswith(b"btime "):
+                return int(line.split()[1])
+    return 0
+
+
+def _read(path: str) -> bytes:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 65536)
+    finally:
+        os.close(fd)
+
+
+def _read_proc_entry(pid: int, btime: int, hz: int) -> dict | None:
+    """
+    One /proc/<pid> record, or None if the process vanished mid-read.
+    stat/status are required; cmdline/exe are best-effort (kernel threads and
+    other users' processes return empty or EACCES).
+    """
+    base = f"{PROC_DIR}/{pid}/"
+    try:
+        stat = _read(base + "stat")
+        status = _read(base + "status")
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return None
+
+    # comm may contain spaces and parens: "<pid> (<comm>) <state> <ppid> ..."
+    lpar = stat.find(b"(")
+    rpar = stat.rfind(b")")
+    if lpar < 0 or rpar < 0:
+        return None
+    name = stat[lpar + 1 : rpar].decode("utf-8", errors="replace")
+    fields = stat[rpar + 2 :].split()
+    # fields[0] is state (stat field 3); ppid is field 4, starttime is field 22
+    try:
+        ppid = int(fields[1])
+        start_ticks = int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+    uid = None
+    for line in status.splitlines():
+        if line.startswith(b"Uid:"):
+            parts = line.split()
+            if len(parts) > 1 and parts[1].isdigit():
+                uid = int(parts[1])
+            break
+
+    try:
+        raw = _read(base + "cmdline")
+        cmdline = raw.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", errors="replace")
+    except OSError:
+        cmdline = ""
+
+    try:
+        exe = os.readlink(base + "exe")
+    except OSError:
+        exe = None
+
+    return {
+        "pid": pid,
+        "name": name or "unknown",
+        "ppid": ppid,
+        "uid": uid,
+        "start_time": btime + start_ticks // hz if btime else None,
+        "exe": exe,
+        "cmdline": cmdline,
+    }
+
+
+def _list_processes_procfs() -> list[dict]:
+    """
+    Native Linux collector: walks /proc directly instead of forking ps.
+    Processes that exit during the walk are skipped silently.
+    """
+    btime = _boot_time()
+    hz = os.sysconf("SC_CLK_TCK") or 100
+    procs: list[dict] = []
+    with os.scandir(PROC_DIR) as it:
+        for entry in it:
+            if not entry.name.isdigit():
+                continue
+            rec = _read_proc_entry(int(entry.name), btime, hz)
+            if rec is not None:
+                procs.append(rec)
+    return procs
+
+
+def list_processes() -> list[dict]:
+    """
+    Returns a process list: [{"pid": int, "name": str, ...}]
+    Windows: tasklist CSV
+    Linux: /proc (adds ppid, uid, start_time, exe, cmdline)
+    macOS/other: ps
+    """
+    system = platform.system().lower()
+
+    if system == "windows":
+        procs = _list_processes_windows()
+    elif system == "linux" and (PROC_DIR / "stat").exists():
+        procs = _list_processes_procfs()
+    else:
+        procs = _list_processes_ps()
+
     procs.sort(key=lambda x: (x["name"].lower(), x["pid"]))
     return procs
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import platform
-import subprocess
 import re
 
+from shona_core.utils.proc import check_output
+
 
 def _not_supported() -> list[dict]:
     return [{"error": "services scan not supported on this OS"}]
@@ -17,7 +18,7 @@ def list_services(limit: int = 400) -> list[dict]:
         return _not_supported()
 
     try:
-        out = subprocess.check_output(["sc", "queryex", "type=", "service", "state=", "all"], text=True, errors="ignore")  # noqa: S603,S607
+        out = check_output(["sc", "queryex", "type=", "service", "state=", "all"], text=True, errors="ignore")  # noqa: S603,S607
     except Exception:
         return [{"error": "failed to query services"}]
 
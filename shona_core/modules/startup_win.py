@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import os
 import platform
-import subprocess
 from pathlib import Path
 
+from shona_core.utils.proc import check_output
+
 
 def _not_supported() -> list[dict]:
     return [{"error": "startup scan not supported on this OS"}]
@@ -51,7 +52,7 @@ def list_startup_entries() -> list[dict]:
 
     for key in run_keys:
         try:
-            out = subprocess.check_output(["reg", "query", key], text=True, errors="ignore")  # noqa: S603,S607
+            out = check_output(["reg", "query", key], text=True, errors="ignore")  # noqa: S603,S607
             for line in out.splitlines():
                 line = line.strip()
                 if not line or line.startswith(key):
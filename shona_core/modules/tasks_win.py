@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import platform
-import subprocess
+
+from shona_core.utils.proc import check_output
 
 
 def _not_supported() -> list[dict]:
@@ -17,7 +18,7 @@ def list_scheduled_tasks(limit: int = 200) -> list[dict]:
         return _not_supported()
 
     try:
-        out = subprocess.check_output(["schtasks", "/Query", "/FO", "CSV", "/V"], text=True, errors="ignore")  # noqa: S603,S607
+        out = check_output(["schtasks", "/Query", "/FO", "CSV", "/V"], text=True, errors="ignore")  # noqa: S603,S607
     except Exception:
         return [{"error": "failed to query scheduled tasks"}]
 
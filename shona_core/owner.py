@@ -3,12 +3,13 @@ from __future__ import annotations
 import base64
 import hashlib
 import hmac
-import json
 import os
 import secrets
 import time
 from pathlib import Path
 
+from shona_core.utils.statefile import read_json, write_json
+
 STATE_DIR = Path(".shona/state")
 OWNER_FILE = STATE_DIR / "owner.json"
 TOKEN_FILE = STATE_DIR / "owner_token.json"
@@ -35,16 +36,16 @@ def owner_init(pin: str) -> dict:
         "pin_hash": _hash_pin(pin, salt),
         "created_utc": int(time.time()),
     }
-    OWNER_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    write_json(OWNER_FILE, data)
     return {"ok": True, "message": "Owner PIN set.", "owner_file": str(OWNER_FILE)}
 
 
 def owner_verify(pin: str, ttl_seconds: int = 300) -> dict:
     _ensure()
-    if not OWNER_FILE.exists():
+    data = read_json(OWNER_FILE)
+    if data is None:
         return {"ok": False, "message": "Owner not initialized. Run: shona owner init"}
 
-    data = json.loads(OWNER_FILE.read_text(encoding="utf-8"))
     salt = base64.b64decode(data["salt_b64"])
     expected = data["pin_hash"]
     got = _hash_pin(pin, salt)
@@ -54,16 +55,15 @@ def owner_verify(pin: str, ttl_seconds: int = 300) -> dict:
 
     token = secrets.token_urlsafe(24)
     exp = int(time.time()) + int(ttl_seconds)
-    TOKEN_FILE.write_text(json.dumps({"token": token, "exp": exp}, indent=2), encoding="utf-8")
+    write_json(TOKEN_FILE, {"token": token, "exp": exp})
     return {"ok": True, "token": token, "expires_in": ttl_seconds}
 
 
 def require_token(token: str) -> dict:
-    _ensure()
-    if not TOKEN_FILE.exists():
+    data = read_json(TOKEN_FILE)
+    if data is None:
         return {"ok": False, "message": "No active token. Run: shona owner verify"}
 
-    data = json.loads(TOKEN_FILE.read_text(encoding="utf-8"))
     exp = int(data.get("exp", 0))
     stored = str(data.get("token", ""))
 
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
+import threading
 from pathlib import Path
 from typing import Any
 
+from shona_core.ignore_rules import SURFACE_KINDS, IgnoreMatcher
+from shona_core.utils.statefile import read_json, write_json
+
 RUNTIME_DIR = Path(".shona")
 STATE_DIR = RUNTIME_DIR / "state"
 IGNORE_FILE = STATE_DIR / "ignore.json"
 BASELINE_FILE = STATE_DIR / "baseline.json"
 
+DEFAULT_IGNORE = {"processes": [], "ports": [], "startup": [], "scheduled_tasks": [], "services": [], "paths": []}
+
 
 def _ensure() -> None:
     (RUNTIME_DIR / "snapshots").mkdir(parents=True, exist_ok=True)
@@ -16,19 +24,40 @@ def _ensure() -> None:
 
 
 def load_ignore() -> dict:
-    _ensure()
-    if not IGNORE_FILE.exists():
-        return {"processes": [], "ports": [], "paths": []}
-    return json.loads(IGNORE_FILE.read_text(encoding="utf-8"))
+    """
+    Re-parsed only when ignore.json changes on disk. Shared: don't modify the result.
+    """
+    return read_json(IGNORE_FILE, default=DEFAULT_IGNORE)
+
+
+# (ignore data object, its version): load_ignore() hands out the same object
+# until the file changes, so the hash is computed once per change
+_VERSION: tuple[object, str] | None = None
+_VERSION_LOCK = threading.Lock()
+
+
+def ignore_version(data: dict | None = None) -> str:
+    """
+    Short content hash of the ignore list; changes whenever an entry is added/removed.
+    """
+    global _VERSION
+    data = load_ignore() if data is None else data
+    with _VERSION_LOCK:
+        if _VERSION is not None and _VERSION[0] is data:
+            return _VERSION[1]
+    version = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    with _VERSION_LOCK:
+        _VERSION = (data, version)
+    return version
 
 
 def save_ignore(data: dict) -> None:
     _ensure()
-    IGNORE_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    write_json(IGNORE_FILE, data)
 
 
 def ignore_add(kind: str, value: str) -> dict:
-    data = load_ignore()
+    data = copy.deepcopy(load_ignore())
     if kind not in data:
         data[kind] = []
     if value not in data[kind]:
@@ -39,37 +68,45 @@ def ignore_add(kind: str, value: str) -> dict:
 
 def baseline_set(snapshot_path: str) -> dict:
     _ensure()
-    data = {"snapshot": snapshot_path}
-    BASELINE_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    return data
+    return write_json(BASELINE_FILE, {"snapshot": snapshot_path})
 
 
 def baseline_get() -> dict | None:
-    _ensure()
-    if not BASELINE_FILE.exists():
-        return None
-    return json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    return read_json(BASELINE_FILE)
 
 
-def apply_ignore_to_diff(diff: dict) -> dict:
-    """
-    Removes ignored items from diff output. Keeps structure stable.
-    """
-    ig = load_ignore()
-    out = json.loads(json.dumps(diff))  # deep copy
-
-    procs_added = out.get("processes", {}).get("added", [])
-    procs_removed = out.get("processes", {}).get("removed", [])
-    ignored_procs = set(ig.get("processes", []))
+_MATCHER: tuple[str, IgnoreMatcher] | None = None
 
-    out["processes"]["added"] = [p for p in procs_added if p not in ignored_procs]
-    out["processes"]["removed"] = [p for p in procs_removed if p not in ignored_procs]
 
-    ports_added = out.get("ports", {}).get("added", [])
-    ports_removed = out.get("ports", {}).get("removed", [])
-    ignored_ports = set(ig.get("ports", []))
+def ignore_matcher() -> IgnoreMatcher:
+    """
+    The compiled ignore rules, rebuilt only when ignore.json content changes.
+    """
+    global _MATCHER
+    data = load_ignore()
+    version = ignore_version(data)
+    if _MATCHER is None or _MATCHER[0] != version:
+        _MATCHER = (version, IgnoreMatcher(data))
+    return _MATCHER[1]
 
-    out["ports"]["added"] = [p for p in ports_added if p not in ignored_ports]
-    out["ports"]["removed"] = [p for p in ports_removed if p not in ignored_ports]
 
+def apply_ignore_to_diff(diff: dict) -> dict:
+    """
+    Removes ignored items from diff output. Keeps structure stable.
+    Returns a new top-level dict; surfaces without active rules are shared
+    with the input, not copied.
+    """
+    matcher = ignore_matcher()
+    out = dict(diff)
+    for kind in SURFACE_KINDS:
+        surface = diff.get(kind)
+        if not isinstance(surface, dict) or not matcher.active(kind):
+            continue
+        filtered = dict(surface)
+        for side in ("added", "removed"):
+            items = surface.get(side) or []
+            filtered[side] = [x for x in items if not matcher.match(kind, x)]
+        if surface.get("modified"):
+            filtered["modified"] = [m for m in surface["modified"] if not matcher.match(kind, m["key"])]
+        out[kind] = filtered
     return out
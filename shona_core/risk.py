@@ -25,6 +25,18 @@ def score_diff(diff: dict) -> dict:
     add("scheduled_tasks", weight=8, cap=60)
     add("services", weight=6, cap=50)
 
+    # same entry, different binary on disk: replaced in place
+    def modified(cat: str, weight: int, cap: int) -> None:
+        nonlocal score
+        n = len(diff.get(cat, {}).get("modified", []))
+        if n:
+            score += min(cap, weight * n)
+            notes.append(f"{cat} with a different binary behind the same name ({n})")
+
+    modified("processes", weight=5, cap=30)
+    modified("startup", weight=30, cap=90)
+    modified("scheduled_tasks", weight=30, cap=90)
+
     if score >= 80:
         severity = "high"
     elif score >= 30:
@@ -33,4 +45,7 @@ def score_diff(diff: dict) -> dict:
         severity = "low"
 
     explain = "Detected: " + (", ".join(notes) if notes else "no notable changes")
+    unknown = diff.get("unknown") or []
+    if unknown:
+        explain += f" (not compared, collector timed out or failed: {', '.join(unknown)})"
     return {"severity": severity, "score": score, "explain": explain}
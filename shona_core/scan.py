@@ -3,13 +3,22 @@ from __future__ import annotations
 import platform
 import socket
 import getpass
+import threading
+import time
 from pathlib import Path
+from typing import Callable
 
-from shona_core.utils.io import utc_now_compact, write_json
+from shona_core import catalog
+from shona_core.settings import load_settings
+from shona_core.utils.io import SNAPM_SUFFIX, SNAPZ_SUFFIX, utc_now_compact, write_snapshot
+from shona_core.utils.lock import file_lock
+from shona_core.utils.proc import collector_budget
 from shona_core.modules.processes import list_processes
 from shona_core.modules.ports import list_listening_ports
 
 SNAP_DIR = Path(".shona/snapshots")
+# held for the duration of a collection: one scan per host across CLI, web, tray, watch
+SCAN_LOCK = Path(".shona/state/scan.lock")
 
 
 def _basic_system_info() -> dict:
@@ -45,23 +54,160 @@ def _maybe_services() -> list[dict]:
     return list_services()
 
 
-def run_scan() -> Path:
-    ts = utc_now_compact()
-    info = _basic_system_info()
+# snapshot section -> (collector, time budget in seconds). Each one mostly waits
+# on a subprocess or /proc, so they overlap well in threads.
+COLLECTORS: list[tuple[str, Callable[[], list[dict]], float]] = [
+    ("processes", list_processes, 20.0),
+    ("listening_ports", list_listening_ports, 20.0),
+    ("startup", _maybe_startup, 30.0),
+    ("scheduled_tasks", _maybe_tasks, 60.0),
+    ("services", _maybe_services, 30.0),
+]
+# extra wait on top of a collector's budget before its stuck thread is abandoned
+GRACE_SECONDS = 5.0
 
-    snapshot = {
+
+def _run_one(fn: Callable[[], list[dict]], budget_s: float) -> tuple[list[dict], dict]:
+    """
+    Runs one collector under its budget. Never raises: failures come back as
+    meta {"status": "timeout"|"error", ...} with an empty item list.
+    """
+    t0 = time.perf_counter()
+    with collector_budget(budget_s) as budget:
+        try:
+            items = fn()
+            status = "timeout" if budget.timed_out else "ok"
+            message = None
+        except Exception as e:
+            items = []
+            status = "timeout" if budget.timed_out else "error"
+            message = str(e) or e.__class__.__name__
+
+    # Windows collectors report failure as [{"error": "..."}] rather than raising
+    if status == "ok" and items and all("error" in it for it in items):
+        status = "error"
+        message = items[0]["error"]
+
+    meta: dict = {"status": status, "ms": round((time.perf_counter() - t0) * 1000, 2)}
+    if message:
+        meta["message"] = message
+    if status != "ok":
+        items = []
+    return items, meta
+
+
+def _run_collectors(concurrent: bool) -> tuple[dict, dict]:
+    """
+    Returns ({section: items}, {section: {"status": ..., "ms": wall_clock_ms}}).
+    """
+    sections: dict = {}
+    meta: dict = {}
+
+    if not concurrent:
+        for name, fn, budget_s in COLLECTORS:
+            sections[name], meta[name] = _run_one(fn, budget_s)
+        return sections, meta
+
+    # one daemon thread per collector: all start at once, so each deadline runs
+    # from its own start, and an abandoned thread cannot hold up interpreter exit
+    # (ThreadPoolExecutor joins its workers at exit)
+    results: dict[str, tuple[list[dict], dict]] = {}
+    threads: list[tuple[str, threading.Thread, float]] = []
+    for name, fn, budget_s in COLLECTORS:
+        def target(name=name, fn=fn, budget_s=budget_s) -> None:
+            results[name] = _run_one(fn, budget_s)
+
+        t = threading.Thread(target=target, name=f"shona-scan-{name}", daemon=True)
+        t.start()
+        threads.append((name, t, time.monotonic() + budget_s + GRACE_SECONDS))
+
+    for name, t, deadline in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+        if name in results:
+            sections[name], meta[name] = results[name]
+        else:
+            # stuck outside any subprocess (e.g. a blocked /proc read); abandon it
+            sections[name], meta[name] = [], {"status": "timeout", "ms": None}
+
+    return sections, meta
+
+
+def _hash_targets(sections: dict) -> dict:
+    """
+    Records what entries point at on disk: startup and scheduled task items get
+    "sha256" of their target, processes "exe_sha256". Returns hashing meta.
+    """
+    from shona_core.utils.hashing import command_path, hash_files
+
+    settings = load_settings()
+    targets: list[tuple[dict, str, str]] = []
+    for it in sections.get("startup", []):
+        p = command_path(str(it.get("value") or ""))
+        if p:
+            targets.append((it, "sha256", p))
+    for it in sections.get("scheduled_tasks", []):
+        p = command_path(str(it.get("Task To Run") or ""))
+        if p:
+            targets.append((it, "sha256", p))
+    for it in sections.get("processes", []):
+        if it.get("exe"):
+            targets.append((it, "exe_sha256", it["exe"]))
+
+    hashes, stats = hash_files(
+        [p for _, _, p in targets],
+        budget_s=float(settings.get("hash_budget_s", 20.0)),
+    )
+    for it, field, p in targets:
+        if p in hashes:
+            it[field] = hashes[p]
+    stats["status"] = "timeout" if stats.pop("timed_out") else "ok"
+    return stats
+
+
+def collect_snapshot(concurrent: bool = True) -> dict:
+    """
+    Collects every surface into one shona.snapshot.v3 document, without
+    writing it. Each collector runs on its own daemon thread and is waited
+    for until its start + budget + GRACE_SECONDS (concurrent=False runs them
+    one after another in this thread instead). A collector that fails or runs
+    past its budget is recorded in snapshot["collectors"] and its section
+    left empty.
+    """
+    with file_lock(SCAN_LOCK):
+        ts = utc_now_compact()
+        info = _basic_system_info()
+
+        t0 = time.perf_counter()
+        sections, collectors = _run_collectors(concurrent)
+        if load_settings().get("hash_targets", True):
+            # unchanged files come from the hash cache; only new/modified ones are read
+            collectors["hashes"] = _hash_targets(sections)
+
+    return {
         "schema": "shona.snapshot.v3",
         "timestamp_utc": ts,
         "system": info,
-        "processes": list_processes(),
-        "listening_ports": list_listening_ports(),
-        "startup": _maybe_startup(),
-        "scheduled_tasks": _maybe_tasks(),
-        "services": _maybe_services(),
+        **sections,
+        "collectors": collectors,
+        "scan_ms": round((time.perf_counter() - t0) * 1000, 2),
         "notes": "v0.2.0 snapshot includes persistence surfaces",
     }
 
-    filename = f"{info['hostname']}_{ts}.json"
+
+def save_snapshot(snapshot: dict) -> Path:
+    """
+    Writes a collected snapshot in the configured format and catalogs it.
+    """
+    # settings: snapshot_format = "json" (default, legacy) | "compact" (.snapz container)
+    #         | "dedup" (.snapm manifest + content-addressed section blobs)
+    fmt = load_settings().get("snapshot_format", "json")
+    suffix = {"compact": SNAPZ_SUFFIX, "dedup": SNAPM_SUFFIX}.get(fmt, ".json")
+    filename = f"{snapshot['system']['hostname']}_{snapshot['timestamp_utc']}{suffix}"
     out_path = SNAP_DIR / filename
-    write_json(out_path, snapshot)
+    write_snapshot(out_path, snapshot)
+    catalog.record(out_path, snapshot)
     return out_path
+
+
+def run_scan(concurrent: bool = True) -> Path:
+    return save_snapshot(collect_snapshot(concurrent))
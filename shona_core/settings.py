@@ -1,45 +1,64 @@
 from __future__ import annotations
 
-import json
+import copy
 from pathlib import Path
 
+from shona_core.utils.statefile import read_json, write_json
+
 STATE_DIR = Path(".shona/state")
 SETTINGS_FILE = STATE_DIR / "settings.json"
 
+DEFAULT_SETTINGS = {
+    "friend_mode": True,
+    "voice_enabled": False,
+    "voice_rate": 175,
+    "voice_volume": 1.0,
+    "vosk_model_path": ".shona/models/vosk",
+    "stt_silence_s": 1.0,
+    "snapshot_format": "json",
+    "diff_cache_disk": False,
+    "live_cache_ttl": 2.0,
+    "hash_targets": True,
+    "hash_budget_s": 20.0,
+}
+
 
 def _ensure() -> None:
     STATE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_settings() -> dict:
-    _ensure()
-    if not SETTINGS_FILE.exists():
-        return {
-            "friend_mode": True,
-            "voice_enabled": False,
-            "voice_rate": 175,
-            "voice_volume": 1.0,
-            "vosk_model_path": ".shona/models/vosk",
-        }
+def _stored() -> dict:
+    """
+    settings.json as written ({} when missing or unreadable). Shared with the
+    statefile cache: don't modify.
+    """
     try:
-        return json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
+        data = read_json(SETTINGS_FILE, default={})
     except Exception:
-        return {
-            "friend_mode": True,
-            "voice_enabled": False,
-            "voice_rate": 175,
-            "voice_volume": 1.0,
-            "vosk_model_path": ".shona/models/vosk",
-        }
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_settings() -> dict:
+    """
+    DEFAULT_SETTINGS overlaid with settings.json, so keys added since the file
+    was written still have values. settings.json is re-parsed only when it
+    changes on disk; the result is a new dict each call.
+    """
+    return {**DEFAULT_SETTINGS, **_stored()}
 
 
 def save_settings(data: dict) -> dict:
     _ensure()
-    SETTINGS_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    return data
+    return write_json(SETTINGS_FILE, data)
 
 
 def set_setting(key: str, value) -> dict:
-    data = load_settings()
+    """
+    Stores one key; only explicitly set keys are written, defaults stay defaults.
+    Returns the effective settings.
+    """
+    data = copy.deepcopy(_stored())
     data[key] = value
-    return save_settings(data)
+    save_settings(data)
+    return load_settings()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+
+# Content-addressed section store: .shona/blobs/<sha[:2]>/<sha>.z
+# A blob is zlib(canonical JSON) and its name is sha256(canonical JSON).
+BLOB_DIR = Path(".shona/blobs")
+
+# blobs newer than this are never collected, so a scan that has written its
+# sections but not yet its manifest cannot lose them to a concurrent gc
+GC_GRACE_SECONDS = 3600
+
+
+def canonical(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def _blob_path(digest: str) -> Path:
+    return BLOB_DIR / digest[:2] / f"{digest}.z"
+
+
+def put(obj) -> str:
+    """
+    Stores obj once and returns its sha256. Existing blobs are not rewritten,
+    only touched: the fresh mtime puts a reused blob back inside gc's grace
+    period until the manifest referencing it is written.
+    """
+    raw = canonical(obj)
+    digest = hashlib.sha256(raw).hexdigest()
+    path = _blob_path(digest)
+    try:
+        os.utime(path)
+        return digest
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(zlib.compress(raw, 6))
+    os.replace(tmp, path)
+    return digest
+
+
+def get(digest: str):
+    return json.loads(zlib.decompress(_blob_path(digest).read_bytes()))
+
+
+def gc(manifest_paths: list[Path]) -> dict:
+    """
+    Deletes blobs that none of manifest_paths reference.
+    """
+    referenced: set[str] = set()
+    for p in manifest_paths:
+        try:
+            referenced.update(json.loads(p.read_text(encoding="utf-8")).get("section_hashes", {}).values())
+        except Exception:
+            # an unreadable manifest might still reference anything; don't collect blindly
+            return {"ok": False, "message": f"could not read manifest: {p}"}
+
+    removed = 0
+    kept = 0
+    freed = 0
+    cutoff = time.time() - GC_GRACE_SECONDS
+    if BLOB_DIR.exists():
+        for path in BLOB_DIR.glob("*/*.z"):
+            digest = path.name[:-2]
+            st = path.stat()
+            if digest in referenced or st.st_mtime > cutoff:
+                kept += 1
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+            freed += st.st_size
+    return {"ok": True, "removed": removed, "kept": kept, "freed_bytes": freed}
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU keyed by tuples of strings. With disk_dir set, values
+    (JSON-serializable) are also written to disk_dir/<key parts joined by "_">.json
+    and read back on a memory miss, so they survive a restart.
+    """
+
+    def __init__(self, maxsize: int = 128, disk_dir: Path | None = None, disk_maxfiles: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.disk_maxfiles = disk_maxfiles
+        self._data: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key: tuple) -> Path | None:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / ("_".join(str(k) for k in key) + ".json")
+
+    def get(self, key: tuple) -> Any | None:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key: tuple, value: Any) -> None:
+        self._remember(key, value)
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(value), encoding="utf-8")
+            os.replace(tmp, path)
+            self._prune_disk()
+        except OSError:
+            pass
+
+    def _prune_disk(self) -> None:
+        files = list(self.disk_dir.glob("*.json"))
+        if len(files) <= self.disk_maxfiles:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for p in files[: len(files) - self.disk_maxfiles]:
+            p.unlink(missing_ok=True)
+
+    def _remember(self, key: tuple, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class TTLCache:
+    """
+    Single-value cache around a zero-argument producer. A value younger than
+    `ttl` seconds is served as is; otherwise one caller runs the producer and
+    concurrent callers wait for that result instead of starting their own.
+    """
+
+    def __init__(self, producer: Callable[[], Any], ttl: float = 2.0) -> None:
+        self.producer = producer
+        self.ttl = ttl
+        self._value: Any = None
+        self._at: float | None = None
+        self._lock = threading.Lock()
+        self._inflight: threading.Event | None = None
+        self._error: BaseException | None = None
+
+    def get(self, ttl: float | None = None) -> tuple[Any, dict]:
+        """
+        Returns (value, {"cache": "hit"|"miss"|"shared", "age_ms": ...}).
+        "shared" means this caller waited on another caller's collection.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            now = time.monotonic()
+            if self._at is not None and now - self._at < ttl:
+                return self._value, {"cache": "hit", "age_ms": round((now - self._at) * 1000)}
+            waiter = self._inflight
+            if waiter is None:
+                self._inflight = threading.Event()
+
+        if waiter is not None:
+            waiter.wait()
+            with self._lock:
+                if self._error is not None:
+                    raise self._error
+                return self._value, {"cache": "shared", "age_ms": round((time.monotonic() - self._at) * 1000)}
+
+        try:
+            value = self.producer()
+        except BaseException as e:
+            with self._lock:
+                self._error = e
+                done, self._inflight = self._inflight, None
+            done.set()
+            raise
+        with self._lock:
+            self._value, self._at, self._error = value, time.monotonic(), None
+            done, self._inflight = self._inflight, None
+        done.set()
+        return value, {"cache": "miss", "age_ms": 0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._value, self._at = None, None
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import queue
+import shlex
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+# sha256 of files keyed by (device, inode, size, mtime): a file that has not
+# changed on disk is never read twice, across scans and restarts.
+HASH_CACHE = Path(".shona/cache/hashes.sqlite3")
+
+# per-scan limits: wall time, bytes read (cache misses only), and files larger
+# than MAX_FILE_BYTES are skipped rather than read
+DEFAULT_BUDGET_S = 20.0
+DEFAULT_IO_BUDGET = 512 * 1024 * 1024
+MAX_FILE_BYTES = 256 * 1024 * 1024
+WORKERS = 4
+CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    seen INTEGER NOT NULL,
+    PRIMARY KEY (dev, ino, size, mtime_ns)
+);
+"""
+
+_DB_LOCK = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    HASH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(HASH_CACHE), timeout=10, check_same_thread=False)
+    con.executescript(_SCHEMA)
+    return con
+
+
+def _identity(st: os.stat_result) -> tuple[int, int, int, int]:
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _sha256_file(path: str, stop: threading.Event | None = None) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK):
+            if stop is not None and stop.is_set():
+                raise InterruptedError(f"hash budget exhausted: {path}")
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def command_path(command: str) -> str | None:
+    """
+    Best guess at the executable a command line runs: "C:\\Program Files\\x\\a.exe" -q,
+    C:\\Program Files\\x\\a.exe -q (unquoted, spaces) and %SystemRoot%\\x.exe all resolve.
+    Returns None when nothing on disk matches.
+    """
+    cmd = os.path.expandvars((command or "").strip())
+    if not cmd:
+        return None
+    if cmd[0] == '"':
+        end = cmd.find('"', 1)
+        candidate = cmd[1:end] if end > 0 else cmd[1:]
+        return candidate if os.path.isfile(candidate) else None
+    # unquoted: the longest whitespace-delimited prefix that is a file
+    parts = cmd.split()
+    for i in range(len(parts), 0, -1):
+        candidate = " ".join(parts[:i])
+        if os.path.isfile(candidate):
+            return candidate
+    try:
+        first = shlex.split(cmd)[0]
+    except ValueError:
+        return None
+    return first if os.path.isfile(first) else None
+
+
+def hash_files(
+    paths: list[str],
+    budget_s: float = DEFAULT_BUDGET_S,
+    io_budget: int = DEFAULT_IO_BUDGET,
+) -> tuple[dict[str, str], dict]:
+    """
+    Returns ({path: sha256}, stats). Cached identities are answered without
+    reading; misses are hashed on WORKERS daemon threads until the time or byte budget
+    runs out. Paths that could not be hashed are simply absent.
+    """
+    t0 = time.perf_counter()
+    deadline = time.monotonic() + budget_s
+    stats = {"files": 0, "cached": 0, "hashed": 0, "skipped": 0, "bytes_read": 0, "timed_out": False}
+
+    idents: dict[str, tuple[int, int, int, int]] = {}
+    for p in dict.fromkeys(paths):
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        if not os.path.isfile(p):
+            continue
+        idents[p] = _identity(st)
+    stats["files"] = len(idents)
+
+    out: dict[str, str] = {}
+    misses: list[str] = []
+    now = int(time.time())
+    with _DB_LOCK, closing(_connect()) as con:
+        for p, ident in idents.items():
+            row = con.execute(
+                "SELECT sha256 FROM hashes WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?", ident
+            ).fetchone()
+            if row:
+                out[p] = row[0]
+                stats["cached"] += 1
+            else:
+                misses.append(p)
+        if out:
+            con.executemany(
+                "UPDATE hashes SET seen = ? WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                [(now, *idents[p]) for p in out],
+            )
+            con.commit()
+
+    # smallest first: more files fit the budget
+    misses.sort(key=lambda p: idents[p][2])
+    todo: list[str] = []
+    planned = 0
+    for p in misses:
+        size = idents[p][2]
+        if size > MAX_FILE_BYTES or planned + size > io_budget:
+            stats["skipped"] += 1
+            continue
+        planned += size
+        todo.append(p)
+
+    fresh: dict[str, str] = {}
+    if todo:
+        # daemon threads, as in scan._run_collectors: one stuck on a hung
+        # filesystem is abandoned at the deadline and cannot delay exit
+        work: queue.SimpleQueue[str] = queue.SimpleQueue()
+        for p in todo:
+            work.put(p)
+        results: queue.SimpleQueue[tuple[str, str | None]] = queue.SimpleQueue()
+        stop = threading.Event()
+
+        def worker() -> None:
+            while not stop.is_set():
+                try:
+                    p = work.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results.put((p, _sha256_file(p, stop)))
+                except OSError:
+                    results.put((p, None))
+
+        for i in range(min(WORKERS, len(todo))):
+            threading.Thread(target=worker, name=f"shona-hash-{i}", daemon=True).start()
+
+        handled = 0
+        while handled < len(todo):
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                p, digest = results.get(timeout=remaining)
+            except queue.Empty:
+                stats["timed_out"] = True
+                break
+            handled += 1
+            if digest is None:
+                stats["skipped"] += 1
+            else:
+                fresh[p] = digest
+                stats["bytes_read"] += idents[p][2]
+        stop.set()
+        stats["skipped"] += len(todo) - handled
+
+    if fresh:
+        with _DB_LOCK, closing(_connect()) as con, con:
+            con.executemany(
+                "INSERT OR REPLACE INTO hashes (dev, ino, size, mtime_ns, sha256, seen) VALUES (?, ?, ?, ?, ?, ?)",
+                [(*idents[p], h, now) for p, h in fresh.items()],
+            )
+        stats["hashed"] = len(fresh)
+        out.update(fresh)
+
+    stats["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return out, stats
+
+
+def prune_cache(max_age_s: int = 90 * 86400) -> int:
+    """
+    Forgets identities not seen for max_age_s (replaced or deleted files).
+    """
+    with _DB_LOCK, closing(_connect()) as con, con:
+        return con.execute("DELETE FROM hashes WHERE seen < ?", (int(time.time()) - max_age_s,)).rowcount
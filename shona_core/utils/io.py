@@ -1,8 +1,27 @@
 from __future__ import annotations
 import json
+import struct
+import zlib
 from pathlib import Path
 from datetime import datetime, timezone
 
+from shona_core.utils import blobs
+
+# Compact snapshot container (.snapz):
+#   MAGIC | u32 header length | header JSON | zlib(section JSON)...
+# The header holds every small top-level key plus {"sections": {name: [offset, length]}}
+# with offsets relative to the end of the header, so readers can seek to just the
+# sections they need.
+SNAPZ_SUFFIX = ".snapz"
+SNAPZ_MAGIC = b"SHONASNAPZ1\n"
+SNAPZ_SECTIONS = ["processes", "listening_ports", "startup", "scheduled_tasks", "services", "system"]
+
+# Deduplicated snapshot (.snapm): a small JSON manifest holding the same header
+# plus {"section_hashes": {name: sha256}}; sections live in utils/blobs.py.
+SNAPM_SUFFIX = ".snapm"
+
+SNAPSHOT_SUFFIXES = (".json", SNAPZ_SUFFIX, SNAPM_SUFFIX)
+
 def utc_now_compact() -> str:
     return datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
 
@@ -16,6 +35,84 @@ def write_json(path: Path, obj: dict) -> None:
 def read_json(path: Path) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
+def write_snapz(path: Path, obj: dict) -> None:
+    ensure_dir(path.parent)
+    header = {k: v for k, v in obj.items() if k not in SNAPZ_SECTIONS}
+    # item counts let indexers skip decoding sections entirely
+    header["counts"] = {k: len(obj[k]) for k in SNAPZ_SECTIONS if isinstance(obj.get(k), list)}
+    header["sections"] = {}
+    chunks: list[bytes] = []
+    offset = 0
+    for name in SNAPZ_SECTIONS:
+        if name not in obj:
+            continue
+        blob = zlib.compress(json.dumps(obj[name], separators=(",", ":"), sort_keys=True).encode("utf-8"), 6)
+        header["sections"][name] = [offset, len(blob)]
+        chunks.append(blob)
+        offset += len(blob)
+    head = json.dumps(header, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    with path.open("wb") as f:
+        f.write(SNAPZ_MAGIC)
+        f.write(struct.pack(">I", len(head)))
+        f.write(head)
+        for chunk in chunks:
+            f.write(chunk)
+
+def read_snapz(path: Path, sections: list[str] | None = None) -> dict:
+    """
+    Decodes the header and only the requested sections (all if None).
+    """
+    with path.open("rb") as f:
+        if f.read(len(SNAPZ_MAGIC)) != SNAPZ_MAGIC:
+            raise ValueError(f"not a SHONA snapshot container: {path}")
+        (head_len,) = struct.unpack(">I", f.read(4))
+        header = json.loads(f.read(head_len))
+        base = f.tell()
+        index = header.pop("sections", {})
+        out = dict(header)
+        for name, (offset, length) in index.items():
+            if sections is not None and name not in sections:
+                continue
+            f.seek(base + offset)
+            out[name] = json.loads(zlib.decompress(f.read(length)))
+    return out
+
+def write_snapm(path: Path, obj: dict) -> None:
+    manifest = {k: v for k, v in obj.items() if k not in SNAPZ_SECTIONS}
+    manifest["counts"] = {k: len(obj[k]) for k in SNAPZ_SECTIONS if isinstance(obj.get(k), list)}
+    manifest["section_hashes"] = {name: blobs.put(obj[name]) for name in SNAPZ_SECTIONS if name in obj}
+    write_json(path, manifest)
+
+def read_snapm(path: Path, sections: list[str] | None = None) -> dict:
+    out = read_json(path)
+    for name, digest in out.get("section_hashes", {}).items():
+        if sections is None or name in sections:
+            out[name] = blobs.get(digest)
+    return out
+
+def write_snapshot(path: Path, obj: dict) -> None:
+    """
+    Writes legacy JSON, the compact container or a dedup manifest depending
+    on the file suffix.
+    """
+    if path.name.endswith(SNAPZ_SUFFIX):
+        write_snapz(path, obj)
+    elif path.name.endswith(SNAPM_SUFFIX):
+        write_snapm(path, obj)
+    else:
+        write_json(path, obj)
+
+def read_snapshot(path: Path, sections: list[str] | None = None) -> dict:
+    """
+    Transparently loads .json, .snapz and .snapm snapshots. `sections` limits
+    which heavy sections are decoded; legacy .json is always parsed whole.
+    """
+    if path.name.endswith(SNAPZ_SUFFIX):
+        return read_snapz(path, sections)
+    if path.name.endswith(SNAPM_SUFFIX):
+        return read_snapm(path, sections)
+    return read_json(path)
+
 def list_files_sorted(folder: Path, suffix: str):
     if not folder.exists():
         return []
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import signal
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+# Used when a collector runs outside a scan (e.g. `shona tasks list`).
+DEFAULT_TIMEOUT = 60.0
+
+
+@dataclass
+class Budget:
+    """
+    Wall-clock budget for one collector. Subprocesses started while it is
+    active get whatever time is left; timed_out is set if any of them is killed.
+    """
+    deadline: float
+    timed_out: bool = False
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+_BUDGET: contextvars.ContextVar[Budget | None] = contextvars.ContextVar("shona_budget", default=None)
+
+
+@contextmanager
+def collector_budget(seconds: float) -> Iterator[Budget]:
+    budget = Budget(deadline=time.monotonic() + seconds)
+    token = _BUDGET.set(budget)
+    try:
+        yield budget
+    finally:
+        _BUDGET.reset(token)
+
+
+def _kill_tree(p: subprocess.Popen) -> None:
+    if sys.platform.startswith("win"):
+        subprocess.run(["taskkill", "/PID", str(p.pid), "/T", "/F"], capture_output=True)  # noqa: S603,S607
+    else:
+        try:
+            os.killpg(p.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    p.kill()
+
+
+def check_output(cmd: list[str], text: bool = True, errors: str | None = None) -> str:
+    """
+    subprocess.check_output with a deadline. The child gets its own process
+    group so the whole tree is killed when the active budget runs out.
+    Raises subprocess.TimeoutExpired / CalledProcessError like the stdlib.
+    """
+    budget = _BUDGET.get()
+    timeout = budget.remaining() if budget else DEFAULT_TIMEOUT
+    if timeout <= 0:
+        if budget:
+            budget.timed_out = True
+        raise subprocess.TimeoutExpired(cmd, 0)
+
+    kwargs: dict = {}
+    if sys.platform.startswith("win"):
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=text, errors=errors, **kwargs)  # noqa: S603
+    try:
+        out, _ = p.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_tree(p)
+        p.communicate()
+        if budget:
+            budget.timed_out = True
+        raise
+
+    if p.returncode:
+        raise subprocess.CalledProcessError(p.returncode, cmd, output=out)
+    return out
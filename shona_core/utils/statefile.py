@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+# path -> (signature, parsed value). The signature is (mtime_ns, size, inode):
+# write_json() always replaces the file, so every write changes the inode even
+# when mtime granularity would not notice.
+_CACHE: dict[str, tuple[tuple[int, int, int] | None, Any]] = {}
+_LOCK = threading.Lock()
+
+
+def _signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """
+    Parsed JSON of `path`, re-read only when the file's mtime, size or inode
+    changed (`default` when it does not exist). The value is shared between
+    callers: treat it as read-only and copy before modifying.
+    Raises ValueError for unparseable content (not cached).
+    """
+    key = str(path)
+    sig = _signature(path)
+    with _LOCK:
+        hit = _CACHE.get(key)
+    if hit is not None and hit[0] == sig and (sig is not None or hit[1] is default):
+        return hit[1]
+
+    if sig is None:
+        value = default
+    else:
+        try:
+            value = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            sig, value = None, default
+    with _LOCK:
+        _CACHE[key] = (sig, value)
+    return value
+
+
+def write_json(path: Path, data: Any, indent: int | None = 2) -> Any:
+    """
+    Writes to a temp file beside `path` and os.replace()s it in, so a reader
+    sees the old or the new file, never a partial one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, indent=indent), encoding="utf-8")
+    os.replace(tmp, path)
+    with _LOCK:
+        _CACHE[str(path)] = (_signature(path), data)
+    return data
+
+
+def forget(path: Path) -> None:
+    with _LOCK:
+        _CACHE.pop(str(path), None)
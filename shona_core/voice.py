@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from shona_core.settings import load_settings
 
@@ -41,55 +44,225 @@ def voice_status() -> VoiceStatus:
     return VoiceStatus(tts_ok=tts_ok, stt_ok=stt_ok, message=" | ".join(msg))
 
 
-def speak(text: str) -> dict:
+# pending utterances; when full the oldest is dropped (it would be stale anyway)
+SPEECH_QUEUE_MAX = 8
+# utterances that waited longer than this are skipped instead of spoken late
+SPEECH_MAX_AGE = 15.0
+
+_PREFERRED_VOICES = ["zira", "female", "woman", "susan", "eva", "hazel"]
+
+
+@dataclass
+class _Utterance:
+    text: str
+    queued_at: float
+    generation: int
+    max_age: float
+    done: threading.Event = field(default_factory=threading.Event)
+    result: dict = field(default_factory=dict)
+
+
+class _SpeechWorker:
     """
-    Offline TTS. Does NOT store audio.
-    Voice depends on OS voices available.
+    One long-lived thread owning one pyttsx3 engine (engines are not
+    thread-safe, so every call happens here, stop() included: cancel() only
+    bumps the generation and the engine's word callback stops playback). The
+    preferred voice is resolved once at init; rate/volume follow settings per
+    utterance.
     """
-    cfg = load_settings()
-    if not cfg.get("voice_enabled", False):
-        return {"ok": False, "message": "Voice is disabled. Enable: shona config set voice_enabled true"}
 
-    try:
+    def __init__(self, maxsize: int = SPEECH_QUEUE_MAX) -> None:
+        self._q: queue.Queue[_Utterance] = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._engine = None
+        self._props: dict = {}
+        self._generation = 0
+        self._speaking: int | None = None
+        self.dropped = 0
+
+    def submit(self, text: str, interrupt: bool = False, max_age: float = SPEECH_MAX_AGE) -> _Utterance:
+        if interrupt:
+            self.cancel()
+        with self._lock:
+            u = _Utterance(text=text, queued_at=time.monotonic(), generation=self._generation, max_age=max_age)
+            while True:
+                try:
+                    self._q.put_nowait(u)
+                    break
+                except queue.Full:
+                    try:
+                        old = self._q.get_nowait()
+                    except queue.Empty:
+                        continue
+                    self.dropped += 1
+                    old.result = {"ok": False, "message": "dropped (speech queue full)"}
+                    old.done.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="shona-tts", daemon=True)
+                self._thread.start()
+        return u
+
+    def cancel(self) -> int:
+        """
+        Drops everything queued and stops the current utterance at its next
+        word boundary. Returns how many were dropped.
+        """
+        n = 0
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    u = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                n += 1
+                u.result = {"ok": False, "message": "cancelled"}
+                u.done.set()
+        return n
+
+    def pending(self) -> int:
+        return self._q.qsize()
+
+    def _init_engine(self):
         import pyttsx3
-        engine = pyttsx3.init()
-        engine.setProperty("rate", int(cfg.get("voice_rate", 175)))
-        engine.setProperty("volume", float(cfg.get("voice_volume", 1.0)))
 
-        # Attempt to pick a more "feminine" voice if available (Windows voices vary)
+        engine = pyttsx3.init()
+        # runs on this thread inside runAndWait(), so stop() does too
+        engine.connect("started-utterance", lambda name: self._stop_if_cancelled(engine))
+        engine.connect("started-word", lambda name, location, length: self._stop_if_cancelled(engine))
         try:
-            voices = engine.getProperty("voices")
-            preferred = None
-            for v in voices:
+            for v in engine.getProperty("voices"):
                 name = (getattr(v, "name", "") or "").lower()
-                if any(k in name for k in ["zira", "female", "woman", "susan", "eva", "hazel"]):
-                    preferred = v.id
+                if any(k in name for k in _PREFERRED_VOICES):
+                    engine.setProperty("voice", v.id)
                     break
-            if preferred:
-                engine.setProperty("voice", preferred)
         except Exception:
             pass
+        self._props = {}
+        return engine
+
+    def _stop_if_cancelled(self, engine) -> None:
+        if self._speaking is not None and self._speaking != self._generation:
+            self._speaking = None
+            engine.stop()
+
+    def _apply_settings(self, engine) -> None:
+        cfg = load_settings()
+        props = {"rate": int(cfg.get("voice_rate", 175)), "volume": float(cfg.get("voice_volume", 1.0))}
+        for k, val in props.items():
+            if self._props.get(k) != val:
+                engine.setProperty(k, val)
+        self._props = props
+
+    def _run(self) -> None:
+        while True:
+            u = self._q.get()
+            if u.generation != self._generation:
+                u.result = {"ok": False, "message": "cancelled"}
+            elif time.monotonic() - u.queued_at > u.max_age:
+                u.result = {"ok": False, "message": "skipped (stale)"}
+            else:
+                try:
+                    if self._engine is None:
+                        self._engine = self._init_engine()
+                    self._apply_settings(self._engine)
+                    self._speaking = u.generation
+                    self._engine.say(u.text)
+                    self._engine.runAndWait()
+                    stopped = self._speaking is None
+                    u.result = {"ok": False, "message": "cancelled"} if stopped else {"ok": True}
+                except Exception as e:
+                    # re-init on the next utterance rather than reuse a broken engine
+                    self._engine = None
+                    u.result = {"ok": False, "message": str(e)}
+                finally:
+                    self._speaking = None
+            u.done.set()
+
+
+_SPEECH = _SpeechWorker()
 
-        engine.say(text)
-        engine.runAndWait()
-        return {"ok": True}
+
+def speak(text: str, wait: bool = True, interrupt: bool = False, max_age: float = SPEECH_MAX_AGE) -> dict:
+    """
+    Offline TTS. Does NOT store audio.
+    Voice depends on OS voices available.
+    Queued to the speech worker; wait=False returns at once (web handlers),
+    interrupt=True cancels whatever is queued or playing first.
+    """
+    cfg = load_settings()
+    if not cfg.get("voice_enabled", False):
+        return {"ok": False, "message": "Voice is disabled. Enable: shona config set voice_enabled true"}
+
+    u = _SPEECH.submit(text, interrupt=interrupt, max_age=max_age)
+    if not wait:
+        return {"ok": True, "queued": True, "pending": _SPEECH.pending()}
+    u.done.wait()
+    return u.result
+
+
+def cancel_speech() -> dict:
+    return {"ok": True, "cancelled": _SPEECH.cancel()}
+
+
+# STT audio: mono 16 kHz int16, read in 0.25 s blocks so silence is noticed quickly
+STT_RATE = 16000
+STT_BLOCK = 4000
+
+# (model path, vosk.Model): loading a model takes seconds and hundreds of MB,
+# so it happens once per process
+_MODEL: tuple[str, object] | None = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _stt_model(model_path: Path):
+    global _MODEL
+    key = str(model_path.resolve())
+    with _MODEL_LOCK:
+        if _MODEL is None or _MODEL[0] != key:
+            import vosk
+
+            _MODEL = (key, vosk.Model(key))
+        return _MODEL[1]
+
+
+def preload_stt_model() -> dict:
+    """
+    Loads the configured Vosk model into the process-wide cache (web start-up
+    calls this in the background when voice is enabled).
+    """
+    model_path = Path(str(load_settings().get("vosk_model_path", ".shona/models/vosk")))
+    if not model_path.exists():
+        return {"ok": False, "message": f"Vosk model not found at: {model_path}"}
+    try:
+        t0 = time.perf_counter()
+        _stt_model(model_path)
+        return {"ok": True, "ms": round((time.perf_counter() - t0) * 1000, 2)}
     except Exception as e:
         return {"ok": False, "message": str(e)}
 
 
-def listen_ptt(seconds: int = 5) -> dict:
+def listen_ptt(
+    seconds: int = 5,
+    on_partial: Callable[[str], None] | None = None,
+    silence_s: float | None = None,
+) -> dict:
     """
     Optional offline STT using Vosk + sounddevice.
     Requires a local Vosk model path in settings.
-    Push-to-talk concept: record for fixed seconds.
+    Push-to-talk concept: records for at most `seconds`, and stops early once
+    speech was heard and then `silence_s` seconds pass with no new words
+    (settings: stt_silence_s; 0 records the full window). Partial transcripts
+    go to on_partial as they change.
     Does NOT save recordings to disk.
     """
     cfg = load_settings()
     model_path = Path(str(cfg.get("vosk_model_path", ".shona/models/vosk")))
+    silence_s = float(cfg.get("stt_silence_s", 1.0)) if silence_s is None else silence_s
 
     try:
         import json
-        import queue
         import vosk
         import sounddevice as sd
     except Exception:
@@ -109,22 +282,45 @@ def listen_ptt(seconds: int = 5) -> dict:
             pass
         q.put(bytes(indata))
 
-    model = vosk.Model(str(model_path))
-    rec = vosk.KaldiRecognizer(model, 16000)
+    rec = vosk.KaldiRecognizer(_stt_model(model_path), STT_RATE)
+    segments: list[str] = []
+    partial = ""
+    heard_at: float | None = None
+    stopped = "window"
 
-    # record mono 16k
-    with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype="int16", channels=1, callback=callback):
-        # collect for N seconds
-        import time as _t
-        end = _t.time() + max(1, min(seconds, 20))
-        while _t.time() < end:
-            data = q.get()
-            rec.AcceptWaveform(data)
+    t0 = time.monotonic()
+    end = t0 + max(1, min(seconds, 20))
+    with sd.RawInputStream(samplerate=STT_RATE, blocksize=STT_BLOCK, dtype="int16", channels=1, callback=callback):
+        while (now := time.monotonic()) < end:
+            try:
+                data = q.get(timeout=max(0.01, end - now))
+            except queue.Empty:
+                break
+            if rec.AcceptWaveform(data):
+                text = (json.loads(rec.Result()).get("text") or "").strip()
+                if text:
+                    segments.append(text)
+                    heard_at = time.monotonic()
+                partial = ""
+            else:
+                p = (json.loads(rec.PartialResult()).get("partial") or "").strip()
+                if p != partial:
+                    partial = p
+                    if p:
+                        heard_at = time.monotonic()
+                        if on_partial:
+                            on_partial(" ".join([*segments, p]))
+            # speech happened and nothing new for a while: the utterance is over
+            if silence_s > 0 and heard_at is not None and time.monotonic() - heard_at >= silence_s:
+                stopped = "silence"
+                break
 
-    result = rec.FinalResult()
-    try:
-        obj = json.loads(result)
-        text = (obj.get("text") or "").strip()
-    except Exception:
-        text = ""
-    return {"ok": True, "text": text}
+    tail = (json.loads(rec.FinalResult()).get("text") or "").strip()
+    if tail:
+        segments.append(tail)
+    return {
+        "ok": True,
+        "text": " ".join(segments),
+        "stopped": stopped,
+        "ms": round((time.monotonic() - t0) * 1000),
+    }
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from shona_core.diff import diff_key_sets, hash_maps, key_sets
+from shona_core.retention import apply_ignore_to_diff
+from shona_core.risk import score_diff
+from shona_core.scan import collect_snapshot, save_snapshot
+
+
+def _has_changes(diff: dict) -> bool:
+    return any(
+        isinstance(v, dict) and (v.get("added") or v.get("removed") or v.get("modified"))
+        for v in diff.values()
+    )
+
+
+def watch(
+    interval: float = 60.0,
+    heartbeat: float = 3600.0,
+    on_event: Callable[[dict], None] | None = None,
+    stop: threading.Event | None = None,
+    cycles: int | None = None,
+) -> None:
+    """
+    Resident monitor: collects every `interval` seconds and diffs against the
+    previous collection's key sets held in memory (no snapshot files are read).
+    A snapshot is persisted only when something changed or `heartbeat` seconds
+    passed since the last one. Every change is passed to on_event as
+    {"ts", "diff", "risk", "snapshot"}.
+    """
+    stop = stop or threading.Event()
+    prev: dict | None = None
+    prev_hashes: dict = {}
+    prev_label = ""
+    last_saved = 0.0
+    n = 0
+
+    while not stop.is_set():
+        t0 = time.monotonic()
+        snapshot = collect_snapshot()
+        cur = key_sets(snapshot)
+        cur_hashes = hash_maps(snapshot)
+
+        if prev is None:
+            path = save_snapshot(snapshot)
+            last_saved = time.monotonic()
+            prev, prev_label, prev_hashes = cur, path.name, cur_hashes
+        else:
+            diff = apply_ignore_to_diff(diff_key_sets(prev, cur, prev_hashes, cur_hashes))
+            changed = _has_changes(diff)
+            path = None
+            if changed or time.monotonic() - last_saved >= heartbeat:
+                path = save_snapshot(snapshot)
+                last_saved = time.monotonic()
+
+            if changed:
+                diff["from"] = prev_label
+                diff["to"] = path.name
+                if on_event:
+                    on_event({
+                        "ts": int(time.time()),
+                        "diff": diff,
+                        "risk": score_diff(diff),
+                        "snapshot": str(path),
+                    })
+
+            # a failed collector keeps the last good key set for that surface
+            prev = {k: (v if v is not None else prev.get(k)) for k, v in cur.items()}
+            prev_hashes = {k: (v if v is not None else prev_hashes.get(k)) for k, v in cur_hashes.items()}
+            if path is not None:
+                prev_label = path.name
+
+        n += 1
+        if cycles is not None and n >= cycles:
+            break
+        stop.wait(max(0.0, interval - (time.monotonic() - t0)))
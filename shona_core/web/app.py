@@ -1,19 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from shona_core import file_index
+from shona_core.daemon import REQUEST_TIMEOUT, serve_in_background
+from shona_core.find import find_files
 from shona_core.diff import diff_latest_two
 from shona_core.modules.ports import list_listening_ports
 from shona_core.modules.processes import list_processes
 from shona_core.risk import score_diff
 from shona_core.scan import run_scan
 from shona_core.settings import load_settings, set_setting
-from shona_core.voice import speak
+from shona_core.utils.cache import TTLCache
+from shona_core.voice import cancel_speech, preload_stt_model, speak
+from shona_core.web.events import FEED
 
 BASE_DIR = Path(__file__).parent
 TEMPLATES_DIR = BASE_DIR / "templates"
@@ -21,6 +32,17 @@ STATIC_DIR = BASE_DIR / "static"
 
 app = FastAPI(title="SHONA", version="0.3.0")
 
+
+@app.on_event("startup")
+def _warm_caches() -> None:
+    # build/refresh the filename index early so the first `find` is fast
+    file_index.refresh_in_background()
+    # serve the CLI's control socket from this warm process (unless a daemon already does)
+    serve_in_background(ps_cache=_PS_CACHE, ports_cache=_PORTS_CACHE, scan=_daemon_scan)
+    if load_settings().get("voice_enabled", False):
+        # the Vosk model takes seconds to load; do it before the first push-to-talk
+        threading.Thread(target=preload_stt_model, name="shona-stt-preload", daemon=True).start()
+
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
@@ -70,17 +92,172 @@ async def api_say(payload: dict):
     text = str(payload.get("text", "")).strip()
     if not text:
         return JSONResponse({"ok": False, "message": "text required"})
-    res = speak(text)
+    # queued to the speech worker: the handler returns before the audio plays
+    res = speak(text, wait=False, interrupt=bool(payload.get("interrupt", False)))
     return JSONResponse(res)
 
 
+@app.post("/api/say/cancel")
+def api_say_cancel():
+    return JSONResponse(cancel_speech())
+
+
+# ----------------------------
+# Scan jobs
+# ----------------------------
+class ScanJobs:
+    """
+    Runs scans off the request path. Requests that arrive while a scan is
+    queued or running join it (single-flight) instead of starting another.
+    """
+
+    def __init__(self, history: int = 50) -> None:
+        self.history = history
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._done: dict[str, threading.Event] = {}
+        self._active: str | None = None
+
+    def submit(self) -> tuple[dict, bool]:
+        """
+        Returns (job, coalesced). coalesced=True means an in-flight scan was reused.
+        """
+        with self._lock:
+            if self._active is not None:
+                return dict(self._jobs[self._active]), True
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "snapshot": None,
+                "error": None,
+                "created": time.time(),
+                "finished": None,
+            }
+            self._done[job_id] = threading.Event()
+            self._active = job_id
+            while len(self._jobs) > self.history:
+                old, _ = self._jobs.popitem(last=False)
+                self._done.pop(old, None)
+            job = dict(self._jobs[job_id])
+        threading.Thread(target=self._run, args=(job_id,), name=f"shona-scan-{job_id}", daemon=True).start()
+        return job, False
+
+    def _run(self, job_id: str) -> None:
+        self._update(job_id, status="running")
+        try:
+            p = run_scan()
+            self._update(job_id, status="done", snapshot=str(p))
+            FEED.poke()
+        except Exception as e:
+            self._update(job_id, status="error", error=str(e))
+        finally:
+            with self._lock:
+                self._jobs[job_id]["finished"] = time.time()
+                if self._active == job_id:
+                    self._active = None
+                done = self._done.get(job_id)
+            if done:
+                done.set()
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id: str, timeout: float) -> dict | None:
+        done = self._done.get(job_id)
+        if done:
+            done.wait(timeout)
+        return self.get(job_id)
+
+
+SCAN_JOBS = ScanJobs()
+
+
+def _daemon_scan(sequential: bool) -> str:
+    """
+    Control-socket scans join SCAN_JOBS, so they coalesce with UI scans and
+    reach /api/events subscribers (the job's own scan mode applies).
+    """
+    job, _ = SCAN_JOBS.submit()
+    job = SCAN_JOBS.wait(job["id"], REQUEST_TIMEOUT) or job
+    if job["status"] != "done":
+        raise RuntimeError(job.get("error") or f"scan job {job['id']} is {job['status']}")
+    return job["snapshot"]
+
+
+async def _await_job(job: dict, wait: float) -> dict:
+    if wait > 0 and job["status"] in ("queued", "running"):
+        return await asyncio.to_thread(SCAN_JOBS.wait, job["id"], min(wait, 120.0)) or job
+    return job
+
+
 # ----------------------------
 # Core API (buttons)
 # ----------------------------
 @app.post("/api/scan")
-def api_scan():
-    p = run_scan()
-    return JSONResponse({"ok": True, "snapshot": str(p)})
+async def api_scan(wait: float = 0):
+    """
+    Starts (or joins) a scan and returns its job at once; ?wait=N blocks up to N seconds.
+    """
+    job, coalesced = SCAN_JOBS.submit()
+    job = await _await_job(job, wait)
+    return JSONResponse({"ok": True, "job": job, "coalesced": coalesced, "snapshot": job.get("snapshot")})
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_job(job_id: str, wait: float = 0):
+    job = SCAN_JOBS.get(job_id)
+    if job is None:
+        return JSONResponse({"ok": False, "message": "unknown job"}, status_code=404)
+    job = await _await_job(job, wait)
+    return JSONResponse({"ok": True, "job": job})
+
+
+# seconds between keep-alive comments on an idle event stream
+EVENTS_KEEPALIVE = 15.0
+
+
+def _sse(event: dict) -> str:
+    return f"id: {event.get('id', '')}\nevent: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+
+
+@app.get("/api/events")
+async def api_events(request: Request):
+    """
+    Server-Sent Events: one "diff" event (changed items + score_diff) per new
+    snapshot. Slow clients lose their oldest events and get a "lagged" event.
+    """
+    sub = FEED.subscribe(asyncio.get_running_loop())
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    await asyncio.wait_for(sub.ready.wait(), EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                events, dropped = sub.drain()
+                if dropped:
+                    yield _sse({"type": "lagged", "dropped": dropped})
+                for ev in events:
+                    yield _sse(ev)
+        finally:
+            FEED.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/diff")
@@ -90,49 +267,77 @@ def api_diff():
     return JSONResponse({"diff": d, "risk": r})
 
 
+# ----------------------------
+# Live listings (shared, short-lived cache)
+# ----------------------------
+_PS_CACHE = TTLCache(list_processes)
+_PORTS_CACHE = TTLCache(list_listening_ports)
+
+
+def _live(cache: TTLCache) -> tuple[list[dict], dict]:
+    """
+    Every tab and chat command shares one collection per TTL window
+    (settings: live_cache_ttl seconds, 0 disables).
+    """
+    ttl = float(load_settings().get("live_cache_ttl", 2.0))
+    return cache.get(ttl)
+
+
 @app.get("/api/ps")
 def api_ps(limit: int = 30):
-    procs = list_processes()[: max(1, min(limit, 200))]
-    return JSONResponse({"items": procs})
+    procs, meta = _live(_PS_CACHE)
+    return JSONResponse({"items": procs[: max(1, min(limit, 200))], **meta})
 
 
 @app.get("/api/ports")
 def api_ports():
-    return JSONResponse({"items": list_listening_ports()})
+    items, meta = _live(_PORTS_CACHE)
+    return JSONResponse({"items": items, **meta})
 
 
 # ----------------------------
 # Command router (chat)
 # ----------------------------
 def _safe_find_files(query: str, limit: int = 30) -> list[str]:
-    query_l = query.lower().strip()
-    if not query_l:
-        return []
-
-    home = Path.home()
-    bases = [home / "Desktop", home / "Downloads", home / "Documents", home]
-    seen = set()
-    hits: list[str] = []
-
-    for base in bases:
-        if not base.exists():
-            continue
-        try:
-            for p in base.rglob("*"):
-                if not p.is_file():
-                    continue
-                if query_l in p.name.lower():
-                    s = str(p)
-                    if s in seen:
+    """
+    Served from the persistent filename index (.shona/files.sqlite3), which
+    refreshes itself in the background by directory mtime.
+    """
+    return file_index.search(query, limit=limit)
+
+
+@app.get("/api/find")
+def api_find(q: str, limit: int = 200, budget: float = 10.0):
+    """
+    NDJSON stream: {"hit": path} lines as they are found (filename index first,
+    then a live pruned walk for anything the index has not caught up with),
+    ending with one {"done": true, ...} summary line.
+    """
+    limit = max(1, min(limit, 1000))
+    budget = max(0.5, min(budget, 60.0))
+
+    def stream():
+        sent: set[str] = set()
+        for p in file_index.search(q, limit=limit):
+            sent.add(p)
+            yield json.dumps({"hit": p, "source": "index"}) + "\n"
+        stats: dict = {}
+        if len(sent) < limit:
+            walk = find_files(q, file_index.default_roots(), limit=limit, budget_s=budget, stats=stats)
+            try:
+                for p in walk:
+                    if p in sent:
                         continue
-                    seen.add(s)
-                    hits.append(s)
-                    if len(hits) >= limit:
-                        return hits
-        except Exception:
-            continue
+                    sent.add(p)
+                    yield json.dumps({"hit": p, "source": "walk"}) + "\n"
+                    if len(sent) >= limit:
+                        break
+            finally:
+                # stops the walker threads now, also when the client goes away
+                walk.close()
+        yield json.dumps({"done": True, "count": len(sent), **stats}) + "\n"
 
-    return hits
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.post("/api/command")
@@ -155,8 +360,9 @@ async def api_command(payload: dict):
         )
 
     if cmd == "scan":
-        p = run_scan()
-        return JSONResponse({"ok": True, "kind": "scan", "data": {"snapshot": str(p)}, "say": "Snapshot saved. Want a diff?"})
+        job, coalesced = SCAN_JOBS.submit()
+        say = "Already scanning, I'll share that result." if coalesced else "Scanning now. I'll tell you when the snapshot is saved."
+        return JSONResponse({"ok": True, "kind": "scan", "data": {"job": job, "coalesced": coalesced}, "say": say})
 
     if cmd == "diff":
         d = diff_latest_two()
@@ -171,20 +377,23 @@ async def api_command(payload: dict):
         return JSONResponse({"ok": True, "kind": "diff", "data": {"diff": d, "risk": r}, "say": say})
 
     if cmd == "ports":
-        items = list_listening_ports()
-        return JSONResponse({"ok": True, "kind": "ports", "data": {"items": items}, "say": "Here are listening ports. New unexpected ports can matter."})
+        items, meta = await asyncio.to_thread(_live, _PORTS_CACHE)
+        return JSONResponse({"ok": True, "kind": "ports", "data": {"items": items, **meta}, "say": "Here are listening ports. New unexpected ports can matter."})
 
     if cmd.startswith("ps"):
         parts = cmd.split()
         limit = 40
         if len(parts) >= 2 and parts[1].isdigit():
             limit = max(1, min(int(parts[1]), 200))
-        items = list_processes()[:limit]
-        return JSONResponse({"ok": True, "kind": "ps", "data": {"items": items}, "say": f"Here are running processes (top {limit})."})
+        items, meta = await asyncio.to_thread(_live, _PS_CACHE)
+        return JSONResponse({"ok": True, "kind": "ps", "data": {"items": items[:limit], **meta}, "say": f"Here are running processes (top {limit})."})
 
     if cmd.startswith("find "):
         q = cmd[5:].strip()
-        hits = _safe_find_files(q, limit=30)
-        return JSONResponse({"ok": True, "kind": "find", "data": {"query": q, "hits": hits}, "say": f"I found {len(hits)} match(es). Want me to open one?"})
+        hits = await asyncio.to_thread(_safe_find_files, q, 30)
+        say = f"I found {len(hits)} match(es). Want me to open one?"
+        if file_index.is_refreshing():
+            say += " (Still indexing, so more may turn up.)"
+        return JSONResponse({"ok": True, "kind": "find", "data": {"query": q, "hits": hits, "indexing": file_index.is_refreshing()}, "say": say})
 
     return JSONResponse({"ok": False, "kind": "help", "data": {}, "say": "I can run: scan, diff, ports, ps, find <name>."})
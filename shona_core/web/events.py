@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from shona_core import catalog
+from shona_core.diff import diff_latest_two
+from shona_core.risk import score_diff
+from shona_core.scan import SNAP_DIR
+
+# how often the feed looks for a new snapshot (a directory stat; cheap)
+POLL_SECONDS = 2.0
+# events buffered per client before the oldest are dropped
+CLIENT_QUEUE = 32
+# a directory change that has not produced a new catalog row by then is taken
+# as unrelated (a deleted or pruned snapshot) and stops being re-checked
+SETTLE_SECONDS = 10.0
+
+
+class Subscriber:
+    """
+    One connected client: a bounded queue filled from the feed thread and
+    drained by the client's async generator.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxlen: int = CLIENT_QUEUE) -> None:
+        self.loop = loop
+        self.queue: deque[dict] = deque(maxlen=maxlen)
+        self.dropped = 0
+        self.ready = asyncio.Event()
+        self._lock = threading.Lock()
+
+    def push(self, event: dict) -> None:
+        with self._lock:
+            if len(self.queue) == self.queue.maxlen:
+                # slow client: shed the oldest event rather than grow or block the feed
+                self.dropped += 1
+            self.queue.append(event)
+        self.loop.call_soon_threadsafe(self.ready.set)
+
+    def drain(self) -> tuple[list[dict], int]:
+        with self._lock:
+            items = list(self.queue)
+            self.queue.clear()
+            dropped, self.dropped = self.dropped, 0
+            self.ready.clear()
+        return items, dropped
+
+
+class ChangeFeed:
+    """
+    Watches for new snapshots of this host and turns each into one scored diff
+    event, broadcast to every subscriber. The diff is computed once per
+    snapshot, however many clients are connected; the thread only runs while
+    someone is subscribed.
+    """
+
+    def __init__(self, poll: float = POLL_SECONDS) -> None:
+        self.poll = poll
+        self._subs: set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._poked = False
+        self._thread: threading.Thread | None = None
+        self._ids = itertools.count(1)
+        self._last_path: str | None = None
+        self._last_mtime: int | None = None
+        self.last_event: dict | None = None
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop) -> Subscriber:
+        sub = Subscriber(loop)
+        with self._lock:
+            self._subs.add(sub)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="shona-events", daemon=True)
+                self._thread.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    def poke(self) -> None:
+        """
+        Check for a new snapshot now instead of at the next poll, whatever
+        the directory mtime says.
+        """
+        self._poked = True
+        self._wake.set()
+
+    def _newest(self) -> str | None:
+        rows = catalog.latest(socket.gethostname(), 1)
+        return rows[0]["path"] if rows else None
+
+    def _dir_mtime(self) -> int | None:
+        try:
+            return Path(SNAP_DIR).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _prime(self) -> None:
+        self._last_mtime = self._dir_mtime()
+        self._last_path = self._newest()
+
+    def _check(self, poked: bool = False) -> dict | None:
+        """
+        One poll: the event for a newly catalogued snapshot, else None.
+        The directory mtime changes when the file is written, before
+        catalog.record() commits its row, so the mtime is only consumed once
+        the catalog shows the new snapshot (or the change has settled):
+        a poll in that window re-checks next time instead of losing it.
+        """
+        mtime = self._dir_mtime()
+        if mtime is None or (mtime == self._last_mtime and not poked):
+            return None
+        try:
+            newest = self._newest()
+            if newest is None or newest == self._last_path:
+                if time.time() - mtime / 1e9 > SETTLE_SECONDS:
+                    self._last_mtime = mtime
+                return None
+            self._last_mtime = mtime
+            self._last_path = newest
+            return self._build_event()
+        except Exception as e:
+            return {"id": next(self._ids), "ts": int(time.time()), "type": "error", "message": str(e)}
+
+    def _run(self) -> None:
+        if self._last_path is None:
+            self._prime()
+
+        while True:
+            with self._lock:
+                if not self._subs:
+                    self._thread = None
+                    return
+            self._wake.wait(self.poll)
+            self._wake.clear()
+            poked, self._poked = self._poked, False
+            event = self._check(poked)
+            if event is not None:
+                self._broadcast(event)
+
+    def _build_event(self) -> dict | None:
+        diff = diff_latest_two()
+        if diff.get("ok") is False:
+            return None
+        changes = {
+            k: {"added": v.get("added", []), "removed": v.get("removed", []), "modified": v.get("modified", [])}
+            for k, v in diff.items()
+            if isinstance(v, dict) and (v.get("added") or v.get("removed") or v.get("modified"))
+        }
+        return {
+            "id": next(self._ids),
+            "ts": int(time.time()),
+            "type": "diff",
+            "from": diff.get("from"),
+            "to": diff.get("to"),
+            "risk": score_diff(diff),
+            "changes": changes,
+        }
+
+    def _broadcast(self, event: dict) -> None:
+        self.last_event = event
+        with self._lock:
+            subs = list(self._subs)
+        for sub in subs:
+            sub.push(event)
+
+
+FEED = ChangeFeed()
@@ -58,7 +58,41 @@ async function friendline(){
   $("friendline").textContent = pick;
 }
 
+async function streamFind(q){
+  // NDJSON: hits render as they arrive, last line is the summary
+  const r = await fetch(`/api/find?q=${encodeURIComponent(q)}&limit=200`);
+  const reader = r.body.getReader();
+  const dec = new TextDecoder();
+  const hits = [];
+  let buf = "", summary = {};
+  for(;;){
+    const {value, done} = await reader.read();
+    if(done) break;
+    buf += dec.decode(value, {stream:true});
+    let nl;
+    while((nl = buf.indexOf("\n")) >= 0){
+      const line = buf.slice(0, nl).trim();
+      buf = buf.slice(nl + 1);
+      if(!line) continue;
+      const ev = JSON.parse(line);
+      if(ev.done){ summary = ev; continue; }
+      hits.push(ev.hit);
+      out({query: q, hits, searching: true});
+    }
+  }
+  out({query: q, hits, ...summary});
+  const say = `I found ${hits.length} match(es)${summary.timed_out ? " before the time budget ran out" : ""}. Want me to open one?`;
+  appendBubble("shona", say);
+  await maybeSpeak(say);
+}
+
 async function runCmd(text){
+  const t = text.trim();
+  if(t.toLowerCase().startsWith("find ")){
+    await streamFind(t.slice(5).trim());
+    return;
+  }
+
   const data = await j("/api/command", {
     method: "POST",
     headers: {"Content-Type":"application/json"},
@@ -76,6 +110,22 @@ async function runCmd(text){
   if(data.say) appendBubble("shona", data.say);
   if(data.say) await maybeSpeak(data.say);
 
+  if(data.kind === "scan" && data.data && data.data.job){
+    await followScan(data.data.job);
+  }
+}
+
+async function followScan(job){
+  // long-poll the job until the scan finishes
+  while(job && (job.status === "queued" || job.status === "running")){
+    const r = await j(`/api/jobs/${job.id}?wait=30`);
+    if(!r.ok) break;
+    job = r.job;
+  }
+  out(job);
+  const say = (job && job.status === "done") ? "Snapshot saved. Want a diff?" : "The scan did not finish cleanly.";
+  appendBubble("shona", say);
+  await maybeSpeak(say);
 }
 
 async function doScan(){ appendBubble("user","scan"); await runCmd("scan"); }
@@ -108,5 +158,23 @@ document.addEventListener("keydown", (e)=>{
   }
 });
 
+function listenEvents(){
+  if(!window.EventSource) return;
+  const es = new EventSource("/api/events");
+  es.addEventListener("diff", (e)=>{
+    const ev = JSON.parse(e.data);
+    const risk = ev.risk || {};
+    setMood(risk.severity);
+    out(ev);
+    const n = Object.values(ev.changes || {}).reduce((a, c)=> a + c.added.length + c.removed.length + (c.modified || []).length, 0);
+    appendBubble("shona", `New snapshot: ${n} change(s), risk ${(risk.severity || "low").toLowerCase()}.`);
+  });
+  es.addEventListener("lagged", (e)=>{
+    const ev = JSON.parse(e.data);
+    appendBubble("shona", `Skipped ${ev.dropped} older update(s). Run diff for the full picture.`);
+  });
+}
+
 friendline();
 setMood("CALM");
+listenEvents();
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import socket
+
+from shona_core import catalog
+from shona_core.scan import SNAP_DIR
+from shona_core.utils.io import write_json
+from shona_core.web.events import ChangeFeed
+
+
+def _snapshot(ts: str, procs: list[str]) -> dict:
+    return {
+        "schema": "shona.snapshot.v3",
+        "timestamp_utc": ts,
+        "system": {"hostname": socket.gethostname()},
+        "processes": [{"pid": i, "name": n} for i, n in enumerate(procs, 1)],
+        "listening_ports": [],
+        "startup": [],
+        "scheduled_tasks": [],
+        "services": [],
+    }
+
+
+def _write(ts: str, procs: list[str], record: bool = True):
+    snap = _snapshot(ts, procs)
+    path = SNAP_DIR / f"{socket.gethostname()}_{ts}.json"
+    write_json(path, snap)
+    if record:
+        catalog.record(path, snap)
+    return path, snap
+
+
+def test_poll_between_write_and_record_does_not_lose_the_event(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write("20260101_000000", ["init"])
+    _write("20260101_000100", ["init", "sshd"])
+    feed = ChangeFeed()
+    feed._prime()
+
+    # the scan has written the file (directory mtime moved) but not recorded it yet
+    path, snap = _write("20260101_000200", ["init", "sshd", "nc"], record=False)
+    assert feed._check() is None
+
+    catalog.record(path, snap)
+    event = feed._check()
+    assert event is not None and event["type"] == "diff"
+    assert event["to"] == path.name
+    assert event["changes"]["processes"]["added"] == ["nc"]
+    # consumed: nothing new on the next poll
+    assert feed._check() is None
+
+
+def test_poke_checks_the_catalog_even_without_a_directory_change(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write("20260101_000000", ["init"])
+    feed = ChangeFeed()
+    path, snap = _write("20260101_000100", ["init", "sshd"], record=False)
+    feed._prime()  # mtime already includes the new file, catalog does not
+
+    catalog.record(path, snap)
+    assert feed._check() is None
+    event = feed._check(poked=True)
+    assert event is not None and event["to"] == path.name
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from shona_core import watch as watch_mod
+
+
+def _snapshot(ts: str, sshd_hash: str) -> dict:
+    return {
+        "schema": "shona.snapshot.v3",
+        "timestamp_utc": ts,
+        "system": {"hostname": "test-host"},
+        "processes": [
+            {"pid": 10, "name": "sshd", "exe": "/usr/sbin/sshd", "exe_sha256": sshd_hash},
+            {"pid": 11, "name": "cron", "exe": "/usr/sbin/cron", "exe_sha256": "cc"},
+        ],
+        "listening_ports": [{"proto": "TCP", "local": "0.0.0.0:22", "pid": 10}],
+        "startup": [],
+        "scheduled_tasks": [],
+        "services": [],
+        "collectors": {},
+    }
+
+
+def test_watch_reports_binary_swapped_under_same_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    snaps = iter([_snapshot("20260101_000000", "aa"), _snapshot("20260101_000100", "bb")])
+    monkeypatch.setattr(watch_mod, "collect_snapshot", lambda: next(snaps))
+
+    events: list[dict] = []
+    watch_mod.watch(interval=0, heartbeat=3600, on_event=events.append, cycles=2)
+
+    assert len(events) == 1
+    procs = events[0]["diff"]["processes"]
+    assert procs["added"] == [] and procs["removed"] == []
+    assert procs["modified"] == [{"key": "sshd", "from": ["aa"], "to": ["bb"]}]
+    # the changed collection is persisted, not just reported
+    assert events[0]["snapshot"].endswith("test-host_20260101_000100.json")
+    assert len(list((tmp_path / ".shona" / "snapshots").glob("*.json"))) == 2